@@ -5,18 +5,86 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://cj-mills.github.io',
                 'git_url': 'https://github.com/cj-mills/cjm-yolox-pytorch',
                 'lib_path': 'cjm_yolox_pytorch'},
-  'syms': { 'cjm_yolox_pytorch.inference': { 'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper': ( 'inference.html#yoloxinferencewrapper',
+  'syms': { 'cjm_yolox_pytorch.benchmark': { 'cjm_yolox_pytorch.benchmark.benchmark_assigner': ( 'benchmark.html#benchmark_assigner',
+                                                                                                 'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.benchmark_build_model': ( 'benchmark.html#benchmark_build_model',
+                                                                                                    'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.benchmark_forward': ( 'benchmark.html#benchmark_forward',
+                                                                                                'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.benchmark_loss': ( 'benchmark.html#benchmark_loss',
+                                                                                             'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.benchmark_postprocessing': ( 'benchmark.html#benchmark_postprocessing',
+                                                                                                       'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.compare_results': ( 'benchmark.html#compare_results',
+                                                                                              'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.format_comparison': ( 'benchmark.html#format_comparison',
+                                                                                                'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.get_benchmark_metadata': ( 'benchmark.html#get_benchmark_metadata',
+                                                                                                     'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.load_results': ( 'benchmark.html#load_results',
+                                                                                           'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.make_ground_truths': ( 'benchmark.html#make_ground_truths',
+                                                                                                 'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.measure_peak_memory': ( 'benchmark.html#measure_peak_memory',
+                                                                                                  'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.run_benchmarks': ( 'benchmark.html#run_benchmarks',
+                                                                                             'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.save_results': ( 'benchmark.html#save_results',
+                                                                                           'cjm_yolox_pytorch/benchmark.py'),
+                                             'cjm_yolox_pytorch.benchmark.time_fn': ( 'benchmark.html#time_fn',
+                                                                                      'cjm_yolox_pytorch/benchmark.py')},
+            'cjm_yolox_pytorch.export': { 'cjm_yolox_pytorch.export.check_export_parity': ( 'export.html#check_export_parity',
+                                                                                            'cjm_yolox_pytorch/export.py'),
+                                          'cjm_yolox_pytorch.export.export_onnx': ( 'export.html#export_onnx',
+                                                                                    'cjm_yolox_pytorch/export.py'),
+                                          'cjm_yolox_pytorch.export.export_torchscript': ( 'export.html#export_torchscript',
+                                                                                           'cjm_yolox_pytorch/export.py'),
+                                          'cjm_yolox_pytorch.export.get_example_input': ( 'export.html#get_example_input',
+                                                                                          'cjm_yolox_pytorch/export.py'),
+                                          'cjm_yolox_pytorch.export.get_output_names': ( 'export.html#get_output_names',
+                                                                                         'cjm_yolox_pytorch/export.py'),
+                                          'cjm_yolox_pytorch.export.load_onnx_model': ( 'export.html#load_onnx_model',
+                                                                                        'cjm_yolox_pytorch/export.py'),
+                                          'cjm_yolox_pytorch.export.trace_wrapper': ( 'export.html#trace_wrapper',
+                                                                                      'cjm_yolox_pytorch/export.py')},
+            'cjm_yolox_pytorch.inference': { 'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper': ( 'inference.html#yoloxinferencewrapper',
                                                                                                     'cjm_yolox_pytorch/inference.py'),
                                              'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.__init__': ( 'inference.html#yoloxinferencewrapper.__init__',
                                                                                                              'cjm_yolox_pytorch/inference.py'),
                                              'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.calculate_boxes_and_probs': ( 'inference.html#yoloxinferencewrapper.calculate_boxes_and_probs',
                                                                                                                               'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.crop_tile': ( 'inference.html#yoloxinferencewrapper.crop_tile',
+                                                                                                              'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.decode_output': ( 'inference.html#yoloxinferencewrapper.decode_output',
+                                                                                                                  'cjm_yolox_pytorch/inference.py'),
                                              'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.forward': ( 'inference.html#yoloxinferencewrapper.forward',
                                                                                                             'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.get_output_buffer': ( 'inference.html#yoloxinferencewrapper.get_output_buffer',
+                                                                                                                      'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.get_output_grids': ( 'inference.html#yoloxinferencewrapper.get_output_grids',
+                                                                                                                     'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.letterbox': ( 'inference.html#yoloxinferencewrapper.letterbox',
+                                                                                                              'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.merge_tile_detections': ( 'inference.html#yoloxinferencewrapper.merge_tile_detections',
+                                                                                                                          'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.postprocess_detections': ( 'inference.html#yoloxinferencewrapper.postprocess_detections',
+                                                                                                                           'cjm_yolox_pytorch/inference.py'),
                                              'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.preprocess_input': ( 'inference.html#yoloxinferencewrapper.preprocess_input',
                                                                                                                      'cjm_yolox_pytorch/inference.py'),
                                              'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.process_output': ( 'inference.html#yoloxinferencewrapper.process_output',
-                                                                                                                   'cjm_yolox_pytorch/inference.py')},
+                                                                                                                   'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.process_output_into_buffer': ( 'inference.html#yoloxinferencewrapper.process_output_into_buffer',
+                                                                                                                               'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.tiled_forward': ( 'inference.html#yoloxinferencewrapper.tiled_forward',
+                                                                                                                  'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.YOLOXInferenceWrapper.warmup_output_grids': ( 'inference.html#yoloxinferencewrapper.warmup_output_grids',
+                                                                                                                        'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.get_tile_origins': ( 'inference.html#get_tile_origins',
+                                                                                               'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.letterbox_images': ( 'inference.html#letterbox_images',
+                                                                                               'cjm_yolox_pytorch/inference.py'),
+                                             'cjm_yolox_pytorch.inference.unletterbox_boxes': ( 'inference.html#unletterbox_boxes',
+                                                                                                'cjm_yolox_pytorch/inference.py')},
             'cjm_yolox_pytorch.loss': { 'cjm_yolox_pytorch.loss.SamplingResult': ('loss.html#samplingresult', 'cjm_yolox_pytorch/loss.py'),
                                         'cjm_yolox_pytorch.loss.SamplingResult.__post_init__': ( 'loss.html#samplingresult.__post_init__',
                                                                                                  'cjm_yolox_pytorch/loss.py'),
@@ -29,6 +97,10 @@ d = { 'settings': { 'branch': 'main',
                                                                                           'cjm_yolox_pytorch/loss.py'),
                                         'cjm_yolox_pytorch.loss.YOLOXLoss.flatten_and_concat': ( 'loss.html#yoloxloss.flatten_and_concat',
                                                                                                  'cjm_yolox_pytorch/loss.py'),
+                                        'cjm_yolox_pytorch.loss.YOLOXLoss.get_batch_assignment_results': ( 'loss.html#yoloxloss.get_batch_assignment_results',
+                                                                                                           'cjm_yolox_pytorch/loss.py'),
+                                        'cjm_yolox_pytorch.loss.YOLOXLoss.get_batch_targets': ( 'loss.html#yoloxloss.get_batch_targets',
+                                                                                                'cjm_yolox_pytorch/loss.py'),
                                         'cjm_yolox_pytorch.loss.YOLOXLoss.get_l1_target': ( 'loss.html#yoloxloss.get_l1_target',
                                                                                             'cjm_yolox_pytorch/loss.py'),
                                         'cjm_yolox_pytorch.loss.YOLOXLoss.get_target_single': ( 'loss.html#yoloxloss.get_target_single',
@@ -52,6 +124,12 @@ d = { 'settings': { 'branch': 'main',
                                                                                           'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.ConvModule.forward': ( 'model.html#convmodule.forward',
                                                                                          'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.ConvModule.fuse': ( 'model.html#convmodule.fuse',
+                                                                                      'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.ConvModule.train': ( 'model.html#convmodule.train',
+                                                                                       'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.ConvModule.unfuse': ( 'model.html#convmodule.unfuse',
+                                                                                        'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.DarknetBottleneck': ( 'model.html#darknetbottleneck',
                                                                                         'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.DarknetBottleneck.__init__': ( 'model.html#darknetbottleneck.__init__',
@@ -61,8 +139,14 @@ d = { 'settings': { 'branch': 'main',
                                          'cjm_yolox_pytorch.model.Focus': ('model.html#focus', 'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.Focus.__init__': ( 'model.html#focus.__init__',
                                                                                      'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.Focus.focus_raw_input': ( 'model.html#focus.focus_raw_input',
+                                                                                            'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.Focus.fold_normalization': ( 'model.html#focus.fold_normalization',
+                                                                                               'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.Focus.forward': ( 'model.html#focus.forward',
                                                                                     'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.Focus.unfold_normalization': ( 'model.html#focus.unfold_normalization',
+                                                                                                 'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.SPPBottleneck': ( 'model.html#sppbottleneck',
                                                                                     'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.SPPBottleneck.__init__': ( 'model.html#sppbottleneck.__init__',
@@ -72,8 +156,14 @@ d = { 'settings': { 'branch': 'main',
                                          'cjm_yolox_pytorch.model.YOLOX': ('model.html#yolox', 'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOX.__init__': ( 'model.html#yolox.__init__',
                                                                                      'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOX.fold_normalization': ( 'model.html#yolox.fold_normalization',
+                                                                                               'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOX.forward': ( 'model.html#yolox.forward',
                                                                                     'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOX.fuse': ('model.html#yolox.fuse', 'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOX.unfold_normalization': ( 'model.html#yolox.unfold_normalization',
+                                                                                                 'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOX.unfuse': ('model.html#yolox.unfuse', 'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOXHead': ('model.html#yoloxhead', 'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOXHead.__init__': ( 'model.html#yoloxhead.__init__',
                                                                                          'cjm_yolox_pytorch/model.py'),
@@ -85,8 +175,14 @@ d = { 'settings': { 'branch': 'main',
                                                                                              'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOXHead.forward': ( 'model.html#yoloxhead.forward',
                                                                                         'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOXHead.forward_fused': ( 'model.html#yoloxhead.forward_fused',
+                                                                                              'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOXHead.forward_single': ( 'model.html#yoloxhead.forward_single',
                                                                                                'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOXHead.fuse_predictors': ( 'model.html#yoloxhead.fuse_predictors',
+                                                                                                'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.YOLOXHead.unfuse_predictors': ( 'model.html#yoloxhead.unfuse_predictors',
+                                                                                                  'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOXPAFPN': ('model.html#yoloxpafpn', 'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.YOLOXPAFPN.__init__': ( 'model.html#yoloxpafpn.__init__',
                                                                                           'cjm_yolox_pytorch/model.py'),
@@ -97,7 +193,154 @@ d = { 'settings': { 'branch': 'main',
                                          'cjm_yolox_pytorch.model.YOLOXPAFPN.forward': ( 'model.html#yoloxpafpn.forward',
                                                                                          'cjm_yolox_pytorch/model.py'),
                                          'cjm_yolox_pytorch.model.build_model': ('model.html#build_model', 'cjm_yolox_pytorch/model.py'),
-                                         'cjm_yolox_pytorch.model.init_head': ('model.html#init_head', 'cjm_yolox_pytorch/model.py')},
+                                         'cjm_yolox_pytorch.model.download_checkpoint': ( 'model.html#download_checkpoint',
+                                                                                          'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.file_sha256': ('model.html#file_sha256', 'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.get_checkpoint': ( 'model.html#get_checkpoint',
+                                                                                     'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.init_head': ('model.html#init_head', 'cjm_yolox_pytorch/model.py'),
+                                         'cjm_yolox_pytorch.model.load_checkpoint': ( 'model.html#load_checkpoint',
+                                                                                      'cjm_yolox_pytorch/model.py')},
+            'cjm_yolox_pytorch.profiling': { 'cjm_yolox_pytorch.profiling.LayerProfiler': ( 'profiling.html#layerprofiler',
+                                                                                            'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.__enter__': ( 'profiling.html#layerprofiler.__enter__',
+                                                                                                      'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.__exit__': ( 'profiling.html#layerprofiler.__exit__',
+                                                                                                     'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.__init__': ( 'profiling.html#layerprofiler.__init__',
+                                                                                                     'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.disable': ( 'profiling.html#layerprofiler.disable',
+                                                                                                    'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.enable': ( 'profiling.html#layerprofiler.enable',
+                                                                                                   'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.enabled': ( 'profiling.html#layerprofiler.enabled',
+                                                                                                    'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.export_chrome_trace': ( 'profiling.html#layerprofiler.export_chrome_trace',
+                                                                                                                'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.flops_hook': ( 'profiling.html#layerprofiler.flops_hook',
+                                                                                                       'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.format_table': ( 'profiling.html#layerprofiler.format_table',
+                                                                                                         'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.get_stack': ( 'profiling.html#layerprofiler.get_stack',
+                                                                                                      'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.get_stats': ( 'profiling.html#layerprofiler.get_stats',
+                                                                                                      'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.module_hook': ( 'profiling.html#layerprofiler.module_hook',
+                                                                                                        'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.module_pre_hook': ( 'profiling.html#layerprofiler.module_pre_hook',
+                                                                                                            'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.pop_frame': ( 'profiling.html#layerprofiler.pop_frame',
+                                                                                                      'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.push_frame': ( 'profiling.html#layerprofiler.push_frame',
+                                                                                                       'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.reset': ( 'profiling.html#layerprofiler.reset',
+                                                                                                  'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.LayerProfiler.wrap_method': ( 'profiling.html#layerprofiler.wrap_method',
+                                                                                                        'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.count_module_flops': ( 'profiling.html#count_module_flops',
+                                                                                                 'cjm_yolox_pytorch/profiling.py'),
+                                             'cjm_yolox_pytorch.profiling.get_activation_bytes': ( 'profiling.html#get_activation_bytes',
+                                                                                                   'cjm_yolox_pytorch/profiling.py')},
+            'cjm_yolox_pytorch.quantization': { 'cjm_yolox_pytorch.quantization.QuantizableCSPLayer': ( 'quantization.html#quantizablecsplayer',
+                                                                                                        'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableCSPLayer.forward': ( 'quantization.html#quantizablecsplayer.forward',
+                                                                                                                'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableCSPLayer.init_quantization': ( 'quantization.html#quantizablecsplayer.init_quantization',
+                                                                                                                          'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableDarknetBottleneck': ( 'quantization.html#quantizabledarknetbottleneck',
+                                                                                                                 'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableDarknetBottleneck.forward': ( 'quantization.html#quantizabledarknetbottleneck.forward',
+                                                                                                                         'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableDarknetBottleneck.init_quantization': ( 'quantization.html#quantizabledarknetbottleneck.init_quantization',
+                                                                                                                                   'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableFocus': ( 'quantization.html#quantizablefocus',
+                                                                                                     'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableFocus.forward': ( 'quantization.html#quantizablefocus.forward',
+                                                                                                             'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableFocus.init_quantization': ( 'quantization.html#quantizablefocus.init_quantization',
+                                                                                                                       'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableSPPBottleneck': ( 'quantization.html#quantizablesppbottleneck',
+                                                                                                             'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableSPPBottleneck.forward': ( 'quantization.html#quantizablesppbottleneck.forward',
+                                                                                                                     'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableSPPBottleneck.init_quantization': ( 'quantization.html#quantizablesppbottleneck.init_quantization',
+                                                                                                                               'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableSiLU': ( 'quantization.html#quantizablesilu',
+                                                                                                    'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableSiLU.__init__': ( 'quantization.html#quantizablesilu.__init__',
+                                                                                                             'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableSiLU.forward': ( 'quantization.html#quantizablesilu.forward',
+                                                                                                            'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOX': ( 'quantization.html#quantizableyolox',
+                                                                                                     'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOX.fold_normalization': ( 'quantization.html#quantizableyolox.fold_normalization',
+                                                                                                                        'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOX.forward': ( 'quantization.html#quantizableyolox.forward',
+                                                                                                             'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOX.init_quantization': ( 'quantization.html#quantizableyolox.init_quantization',
+                                                                                                                       'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOXPAFPN': ( 'quantization.html#quantizableyoloxpafpn',
+                                                                                                          'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOXPAFPN._bottom_up': ( 'quantization.html#quantizableyoloxpafpn._bottom_up',
+                                                                                                                     'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOXPAFPN._top_down': ( 'quantization.html#quantizableyoloxpafpn._top_down',
+                                                                                                                    'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.QuantizableYOLOXPAFPN.init_quantization': ( 'quantization.html#quantizableyoloxpafpn.init_quantization',
+                                                                                                                            'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.calibrate': ( 'quantization.html#calibrate',
+                                                                                              'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.convert_quantization': ( 'quantization.html#convert_quantization',
+                                                                                                         'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.prepare_quantization': ( 'quantization.html#prepare_quantization',
+                                                                                                         'cjm_yolox_pytorch/quantization.py'),
+                                                'cjm_yolox_pytorch.quantization.quantize_model': ( 'quantization.html#quantize_model',
+                                                                                                   'cjm_yolox_pytorch/quantization.py')},
+            'cjm_yolox_pytorch.serving': { 'cjm_yolox_pytorch.serving.DynamicBatcher': ( 'serving.html#dynamicbatcher',
+                                                                                         'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.__enter__': ( 'serving.html#dynamicbatcher.__enter__',
+                                                                                                   'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.__exit__': ( 'serving.html#dynamicbatcher.__exit__',
+                                                                                                  'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.__init__': ( 'serving.html#dynamicbatcher.__init__',
+                                                                                                  'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.close': ( 'serving.html#dynamicbatcher.close',
+                                                                                               'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.get_metrics': ( 'serving.html#dynamicbatcher.get_metrics',
+                                                                                                     'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.infer': ( 'serving.html#dynamicbatcher.infer',
+                                                                                               'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.infer_async': ( 'serving.html#dynamicbatcher.infer_async',
+                                                                                                     'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.next_batch': ( 'serving.html#dynamicbatcher.next_batch',
+                                                                                                    'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.queue_depth': ( 'serving.html#dynamicbatcher.queue_depth',
+                                                                                                     'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.run_batch': ( 'serving.html#dynamicbatcher.run_batch',
+                                                                                                   'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.run_worker': ( 'serving.html#dynamicbatcher.run_worker',
+                                                                                                    'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.start': ( 'serving.html#dynamicbatcher.start',
+                                                                                               'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.DynamicBatcher.submit': ( 'serving.html#dynamicbatcher.submit',
+                                                                                                'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.InferenceRequest': ( 'serving.html#inferencerequest',
+                                                                                           'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline': ( 'serving.html#streamingpipeline',
+                                                                                            'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.__call__': ( 'serving.html#streamingpipeline.__call__',
+                                                                                                     'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.__init__': ( 'serving.html#streamingpipeline.__init__',
+                                                                                                     'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.forward': ( 'serving.html#streamingpipeline.forward',
+                                                                                                    'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.get_stage_timings': ( 'serving.html#streamingpipeline.get_stage_timings',
+                                                                                                              'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.postprocess': ( 'serving.html#streamingpipeline.postprocess',
+                                                                                                        'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.preprocess': ( 'serving.html#streamingpipeline.preprocess',
+                                                                                                       'cjm_yolox_pytorch/serving.py'),
+                                           'cjm_yolox_pytorch.serving.StreamingPipeline.record_time': ( 'serving.html#streamingpipeline.record_time',
+                                                                                                        'cjm_yolox_pytorch/serving.py')},
             'cjm_yolox_pytorch.simota': { 'cjm_yolox_pytorch.simota.AssignResult': ( 'simota.html#assignresult',
                                                                                      'cjm_yolox_pytorch/simota.py'),
                                           'cjm_yolox_pytorch.simota.SimOTAAssigner': ( 'simota.html#simotaassigner',
@@ -106,10 +349,36 @@ d = { 'settings': { 'branch': 'main',
                                                                                                 'cjm_yolox_pytorch/simota.py'),
                                           'cjm_yolox_pytorch.simota.SimOTAAssigner.assign': ( 'simota.html#simotaassigner.assign',
                                                                                               'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.batch_assign': ( 'simota.html#simotaassigner.batch_assign',
+                                                                                                    'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.batch_dynamic_k_matching': ( 'simota.html#simotaassigner.batch_dynamic_k_matching',
+                                                                                                                'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.batch_get_in_gt_and_in_center_info': ( 'simota.html#simotaassigner.batch_get_in_gt_and_in_center_info',
+                                                                                                                          'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.classification_cost': ( 'simota.html#simotaassigner.classification_cost',
+                                                                                                           'cjm_yolox_pytorch/simota.py'),
                                           'cjm_yolox_pytorch.simota.SimOTAAssigner.dynamic_k_matching': ( 'simota.html#simotaassigner.dynamic_k_matching',
                                                                                                           'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.get_candidate_pairs': ( 'simota.html#simotaassigner.get_candidate_pairs',
+                                                                                                           'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.get_grid_candidate_pairs': ( 'simota.html#simotaassigner.get_grid_candidate_pairs',
+                                                                                                                'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.get_grid_layout': ( 'simota.html#simotaassigner.get_grid_layout',
+                                                                                                       'cjm_yolox_pytorch/simota.py'),
                                           'cjm_yolox_pytorch.simota.SimOTAAssigner.get_in_gt_and_in_center_info': ( 'simota.html#simotaassigner.get_in_gt_and_in_center_info',
-                                                                                                                    'cjm_yolox_pytorch/simota.py')},
+                                                                                                                    'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.get_in_gt_and_in_center_masks': ( 'simota.html#simotaassigner.get_in_gt_and_in_center_masks',
+                                                                                                                     'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.sparse_assign': ( 'simota.html#simotaassigner.sparse_assign',
+                                                                                                     'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.SimOTAAssigner.sparse_dynamic_k_matching': ( 'simota.html#simotaassigner.sparse_dynamic_k_matching',
+                                                                                                                 'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.batch_generalized_box_iou': ( 'simota.html#batch_generalized_box_iou',
+                                                                                                  'cjm_yolox_pytorch/simota.py'),
+                                          'cjm_yolox_pytorch.simota.pad_ground_truths': ( 'simota.html#pad_ground_truths',
+                                                                                          'cjm_yolox_pytorch/simota.py')},
             'cjm_yolox_pytorch.utils': { 'cjm_yolox_pytorch.utils.generate_output_grids': ( 'utils.html#generate_output_grids',
                                                                                             'cjm_yolox_pytorch/utils.py'),
+                                         'cjm_yolox_pytorch.utils.is_channels_last': ( 'utils.html#is_channels_last',
+                                                                                       'cjm_yolox_pytorch/utils.py'),
                                          'cjm_yolox_pytorch.utils.multi_apply': ('utils.html#multi_apply', 'cjm_yolox_pytorch/utils.py')}}}
@@ -0,0 +1,391 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/09_benchmark.ipynb.
+
+# %% auto 0
+__all__ = ['BENCHMARK_CONFIG', 'time_fn', 'measure_peak_memory', 'make_ground_truths', 'benchmark_build_model',
+           'benchmark_forward', 'benchmark_postprocessing', 'benchmark_loss', 'benchmark_assigner',
+           'get_benchmark_metadata', 'run_benchmarks', 'save_results', 'load_results', 'compare_results',
+           'format_comparison']
+
+# %% ../nbs/09_benchmark.ipynb 4
+import os
+import json
+import time
+import platform
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from pathlib import Path
+
+import numpy as np
+
+# %% ../nbs/09_benchmark.ipynb 5
+import torch
+import torchvision
+
+# %% ../nbs/09_benchmark.ipynb 6
+from .model import MODEL_TYPES, NORM_STATS, build_model
+from .inference import YOLOXInferenceWrapper
+from .loss import YOLOXLoss
+from .simota import SimOTAAssigner
+from .utils import generate_output_grids
+
+# %% ../nbs/09_benchmark.ipynb 8
+BENCHMARK_CONFIG = dict(
+    model_types=MODEL_TYPES, # The model types for the model construction benchmark.
+    pretrained=False, # Whether the model construction benchmark loads the pretrained checkpoints (from local copies, or downloads them once).
+    num_build_runs=3, # The number of timed runs for each model type in the model construction benchmark.
+    model_type='yolox_tiny', # The model type for the forward pass and post-processing benchmarks.
+    num_classes=80, # The number of classes.
+    batch_sizes=[1, 4], # The batch sizes for the forward pass benchmark.
+    input_dims=[(320, 320), (640, 640)], # The (height, width) of the inputs for the forward pass and post-processing benchmarks.
+    loss_batch_size=4, # The batch size for the loss benchmark.
+    loss_input_dims=(640, 640), # The input (height, width) for the loss and assigner benchmarks.
+    gt_densities=[1, 10, 50, 200], # The numbers of ground truth boxes per image for the loss and assigner benchmarks.
+    num_warmup=2, # The number of untimed runs before timing each case.
+    num_runs=10, # The number of timed runs for each case.
+    num_threads=None, # The number of CPU threads for the benchmarks. Defaults to the current setting.
+    seed=0, # The random seed for the synthetic inputs.
+)
+
+# %% ../nbs/09_benchmark.ipynb 9
+def time_fn(fn:Callable, # The function to time, without arguments.
+            num_warmup:int=2, # The number of untimed runs before timing.
+            num_runs:int=10, # The number of timed runs.
+            synchronize:bool=False # Whether to synchronize CUDA after each run.
+           ) -> Dict[str, float]: # The mean, median, 99th percentile and minimum time in milliseconds.
+    """
+    Time a function over several runs after a warmup.
+    """
+    for _ in range(num_warmup):
+        fn()
+    times = []
+    for _ in range(num_runs):
+        start_time = time.perf_counter()
+        fn()
+        if synchronize:
+            torch.cuda.synchronize()
+        times.append((time.perf_counter() - start_time) * 1000)
+    return {
+        'mean_ms': float(np.mean(times)),
+        'p50_ms': float(np.percentile(times, 50)),
+        'p99_ms': float(np.percentile(times, 99)),
+        'min_ms': float(np.min(times)),
+    }
+
+# %% ../nbs/09_benchmark.ipynb 10
+def measure_peak_memory(fn:Callable, # The function to measure, without arguments.
+                        device:Union[str, torch.device]='cpu' # The device the function runs on.
+                       ) -> int: # The peak memory increase in bytes.
+    """
+    Measure the peak tensor memory a function allocates on top of the memory in use before the call.
+
+    On CUDA devices, this is the peak of the CUDA caching allocator. 
+    On the CPU, the PyTorch profiler records the tensor allocations and frees of the call, which get replayed in order to find the peak. 
+    Unlike the resident set size of the process, this does not depend on what the allocator kept from earlier calls.
+    """
+    device = torch.device(device)
+    if device.type == 'cuda':
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        start_memory = torch.cuda.memory_allocated(device)
+        fn()
+        torch.cuda.synchronize(device)
+        return torch.cuda.max_memory_allocated(device) - start_memory
+
+    with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU], profile_memory=True) as profiler:
+        fn()
+    # Allocations count at the start of the op that makes them, and frees have events of their own
+    memory_events = sorted((event.time_range.start, event.self_cpu_memory_usage) for event in profiler.events() if event.self_cpu_memory_usage != 0)
+    memory = peak_memory = 0
+    for _, memory_usage in memory_events:
+        memory += memory_usage
+        peak_memory = max(peak_memory, memory)
+    return peak_memory
+
+# %% ../nbs/09_benchmark.ipynb 11
+def make_ground_truths(num_gts:int, # The number of ground truth boxes.
+                       input_dims:Tuple[int, int], # The (height, width) of the input.
+                       num_classes:int, # The number of classes.
+                       generator:Optional[torch.Generator]=None # The random number generator.
+                      ) -> Tuple[torch.Tensor, torch.Tensor]: # The boxes in [tl_x, tl_y, br_x, br_y] format [num_gts, 4] and labels [num_gts].
+    """
+    Create random ground truth boxes with sizes between 4 pixels and a third of the input, fully inside the input.
+    """
+    height, width = input_dims
+    max_dims = torch.tensor([width, height]) / 3
+    sizes = torch.rand(num_gts, 2, generator=generator) * (max_dims - 4) + 4
+    top_left = torch.rand(num_gts, 2, generator=generator) * (torch.tensor([width, height]) - sizes)
+    labels = torch.randint(0, num_classes, (num_gts,), generator=generator)
+    return torch.cat([top_left, top_left + sizes], dim=1), labels
+
+# %% ../nbs/09_benchmark.ipynb 12
+def benchmark_build_model(model_types:Sequence[str]=MODEL_TYPES, # The model types.
+                          num_classes:int=80, # The number of classes.
+                          pretrained:bool=False, # Whether to load the pretrained checkpoints.
+                          num_runs:int=3 # The number of timed runs for each model type.
+                         ) -> Dict[str, Dict[str, Any]]: # The timings and parameter count for each model type.
+    """
+    Time `build_model` for each model type, after one untimed run that downloads any missing checkpoints.
+    """
+    results = {}
+    for model_type in model_types:
+        stats = time_fn(lambda: build_model(model_type, num_classes, pretrained=pretrained), num_warmup=1, num_runs=num_runs)
+        stats['num_parameters'] = sum(param.numel() for param in build_model(model_type, num_classes, pretrained=False).parameters())
+        results[f'build_model/{model_type}'] = stats
+    return results
+
+# %% ../nbs/09_benchmark.ipynb 13
+def benchmark_forward(model_type:str='yolox_tiny', # The model type.
+                      num_classes:int=80, # The number of classes.
+                      batch_sizes:Sequence[int]=[1, 4], # The batch sizes.
+                      input_dims:Sequence[Tuple[int, int]]=[(320, 320), (640, 640)], # The (height, width) of the inputs.
+                      num_warmup:int=2, # The number of untimed runs before timing each case.
+                      num_runs:int=10, # The number of timed runs for each case.
+                      device:Union[str, torch.device]='cpu', # The device to run on.
+                      generator:Optional[torch.Generator]=None # The random number generator for the inputs.
+                     ) -> Dict[str, Dict[str, Any]]: # The timings, throughput and peak memory for each batch size and input size.
+    """
+    Time the `YOLOX` forward pass in inference mode over batch sizes and input sizes.
+    """
+    device = torch.device(device)
+    model = build_model(model_type, num_classes, pretrained=False).to(device).eval()
+    results = {}
+    for batch_size in batch_sizes:
+        for height, width in input_dims:
+            x = torch.randn(batch_size, 3, height, width, generator=generator).to(device)
+            with torch.inference_mode():
+                stats = time_fn(lambda: model(x), num_warmup, num_runs, synchronize=device.type == 'cuda')
+                stats['images_per_second'] = batch_size * 1000 / stats['mean_ms']
+                stats['peak_memory_bytes'] = measure_peak_memory(lambda: model(x), device)
+            results[f'forward/{model_type}/b{batch_size}/{height}x{width}'] = stats
+    return results
+
+# %% ../nbs/09_benchmark.ipynb 14
+def benchmark_postprocessing(model_type:str='yolox_tiny', # The model type.
+                             num_classes:int=80, # The number of classes.
+                             input_dims:Sequence[Tuple[int, int]]=[(320, 320), (640, 640)], # The (height, width) of the inputs.
+                             batch_size:int=1, # The batch size.
+                             num_warmup:int=2, # The number of untimed runs before timing each case.
+                             num_runs:int=10, # The number of timed runs for each case.
+                             device:Union[str, torch.device]='cpu', # The device to run on.
+                             generator:Optional[torch.Generator]=None # The random number generator for the inputs.
+                            ) -> Dict[str, Dict[str, Any]]: # The timings for each step and input size.
+    """
+    Time the preprocessing and post-processing steps of `YOLOXInferenceWrapper` (with NMS) separately from the model.
+    """
+    device = torch.device(device)
+    model = build_model(model_type, num_classes, pretrained=False).eval()
+    mean, std = [torch.tensor(stats).view(1, 3, 1, 1) for stats in NORM_STATS[model_type].values()]
+    wrapper = YOLOXInferenceWrapper(model, mean, std, run_nms=True).to(device).eval()
+
+    results = {}
+    for height, width in input_dims:
+        x = torch.randn(batch_size, 3, height, width, generator=generator).to(device)
+        with torch.inference_mode():
+            model_output = model(wrapper.preprocess_input(x))
+            output_grids = wrapper.get_output_grids((height, width), device)
+            processed_output = wrapper.process_output(model_output)
+            boxes_and_probs = wrapper.calculate_boxes_and_probs(processed_output, output_grids)
+            steps = {
+                'preprocess_input': lambda: wrapper.preprocess_input(x),
+                'process_output': lambda: wrapper.process_output(model_output),
+                'calculate_boxes_and_probs': lambda: wrapper.calculate_boxes_and_probs(processed_output, output_grids),
+                'postprocess_detections': lambda: wrapper.postprocess_detections(boxes_and_probs),
+            }
+            for step, fn in steps.items():
+                results[f'postprocessing/{step}/b{batch_size}/{height}x{width}'] = time_fn(fn, num_warmup, num_runs, synchronize=device.type == 'cuda')
+    return results
+
+# %% ../nbs/09_benchmark.ipynb 15
+def benchmark_loss(num_classes:int=80, # The number of classes.
+                   batch_size:int=4, # The batch size.
+                   input_dims:Tuple[int, int]=(640, 640), # The (height, width) of the input.
+                   gt_densities:Sequence[int]=[1, 10, 50, 200], # The numbers of ground truth boxes per image.
+                   num_warmup:int=2, # The number of untimed runs before timing each case.
+                   num_runs:int=10, # The number of timed runs for each case.
+                   generator:Optional[torch.Generator]=None # The random number generator for the inputs.
+                  ) -> Dict[str, Dict[str, Any]]: # The timings and peak memory for each ground truth density.
+    """
+    Time `YOLOXLoss.__call__` on random head outputs that require gradients, over ground truth densities.
+    """
+    loss_fn = YOLOXLoss(num_classes=num_classes)
+    height, width = input_dims
+    output_dims = [(height // stride, width // stride) for stride in loss_fn.strides]
+    class_scores = [torch.randn(batch_size, num_classes, *dims, generator=generator).requires_grad_() for dims in output_dims]
+    predicted_bboxes = [(torch.randn(batch_size, 4, *dims, generator=generator) * 0.5).requires_grad_() for dims in output_dims]
+    objectness_scores = [torch.randn(batch_size, 1, *dims, generator=generator).requires_grad_() for dims in output_dims]
+
+    results = {}
+    for num_gts in gt_densities:
+        ground_truth_bboxes, ground_truth_labels = zip(*[make_ground_truths(num_gts, input_dims, num_classes, generator) for _ in range(batch_size)])
+        run = lambda: loss_fn(class_scores, predicted_bboxes, objectness_scores, list(ground_truth_bboxes), list(ground_truth_labels))
+        stats = time_fn(run, num_warmup, num_runs)
+        stats['peak_memory_bytes'] = measure_peak_memory(run)
+        results[f'loss/b{batch_size}/{height}x{width}/gt{num_gts}'] = stats
+    return results
+
+# %% ../nbs/09_benchmark.ipynb 16
+def benchmark_assigner(num_classes:int=80, # The number of classes.
+                       input_dims:Tuple[int, int]=(640, 640), # The (height, width) of the input.
+                       gt_densities:Sequence[int]=[1, 10, 50, 200], # The numbers of ground truth boxes in the image.
+                       num_warmup:int=2, # The number of untimed runs before timing each case.
+                       num_runs:int=10, # The number of timed runs for each case.
+                       generator:Optional[torch.Generator]=None # The random number generator for the inputs.
+                      ) -> Dict[str, Dict[str, Any]]: # The timings and peak memory for each ground truth density.
+    """
+    Time `SimOTAAssigner.assign` for a single image with random predictions, over ground truth densities.
+    """
+    height, width = input_dims
+    # Output grid boxes in [cx, cy, stride_w, stride_h] format
+    output_grids = generate_output_grids(height, width).float()
+    output_grid_boxes = torch.cat([(output_grids[:, :2] + 0.5) * output_grids[:, 2:], output_grids[:, 2:], output_grids[:, 2:]], dim=1)
+    num_bboxes = output_grid_boxes.shape[0]
+
+    # Random scores, and decoded boxes around the output grid boxes
+    pred_scores = torch.rand(num_bboxes, num_classes, generator=generator)
+    box_centers = output_grid_boxes[:, :2] + torch.randn(num_bboxes, 2, generator=generator) * 8
+    box_sizes = torch.rand(num_bboxes, 2, generator=generator) * 60 + 2
+    decoded_bboxes = torch.cat([box_centers - box_sizes / 2, box_centers + box_sizes / 2], dim=-1)
+
+    assigner = SimOTAAssigner()
+    results = {}
+    for num_gts in gt_densities:
+        gt_bboxes, gt_labels = make_ground_truths(num_gts, input_dims, num_classes, generator)
+        run = lambda: assigner.assign(pred_scores, output_grid_boxes, decoded_bboxes, gt_bboxes, gt_labels)
+        stats = time_fn(run, num_warmup, num_runs)
+        stats['peak_memory_bytes'] = measure_peak_memory(run)
+        results[f'assigner/{height}x{width}/gt{num_gts}'] = stats
+    return results
+
+# %% ../nbs/09_benchmark.ipynb 17
+def get_benchmark_metadata(config:Dict[str, Any], # The benchmark configuration.
+                           device:Union[str, torch.device]='cpu' # The device of the benchmarks.
+                          ) -> Dict[str, Any]: # The software versions, hardware, thread count and configuration.
+    """
+    Describe the environment of a benchmark run, so results only get compared with runs from a matching setup.
+    """
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'torch_version': torch.__version__,
+        'torchvision_version': torchvision.__version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'num_threads': torch.get_num_threads(),
+        'device': str(device),
+        'config': config,
+    }
+
+# %% ../nbs/09_benchmark.ipynb 18
+def run_benchmarks(config:Optional[Dict[str, Any]]=None, # Overrides for `BENCHMARK_CONFIG`.
+                   device:Union[str, torch.device]='cpu' # The device for the forward pass and post-processing benchmarks.
+                  ) -> Dict[str, Any]: # The metadata and the results of each benchmark case.
+    """
+    Run the benchmark suite: model construction for each model type, the forward pass, wrapper post-processing, the loss, and the SimOTA assigner.
+
+    Each benchmark draws its synthetic inputs from a generator seeded with `config['seed']`, 
+    and the models get built without pretrained weights (except for the model construction benchmark with `pretrained`), 
+    so repeated runs measure the same work. Save the results with `save_results` and check them against a baseline with `compare_results`.
+    """
+    config = {**BENCHMARK_CONFIG, **(config or {})}
+    previous_num_threads = torch.get_num_threads()
+    if config['num_threads'] is not None:
+        torch.set_num_threads(config['num_threads'])
+    try:
+        metadata = get_benchmark_metadata(config, device)
+        timing_args = dict(num_warmup=config['num_warmup'], num_runs=config['num_runs'])
+        # Seed the weight initialization as well as the inputs
+        torch.manual_seed(config['seed'])
+        generator = torch.Generator().manual_seed(config['seed'])
+        
+        results = {}
+        results.update(benchmark_build_model(config['model_types'], config['num_classes'], config['pretrained'], config['num_build_runs']))
+        results.update(benchmark_forward(config['model_type'], config['num_classes'], config['batch_sizes'], config['input_dims'], 
+                                         device=device, generator=generator, **timing_args))
+        results.update(benchmark_postprocessing(config['model_type'], config['num_classes'], config['input_dims'], 
+                                                device=device, generator=generator, **timing_args))
+        results.update(benchmark_loss(config['num_classes'], config['loss_batch_size'], config['loss_input_dims'], config['gt_densities'], 
+                                      generator=generator, **timing_args))
+        results.update(benchmark_assigner(config['num_classes'], config['loss_input_dims'], config['gt_densities'], 
+                                          generator=generator, **timing_args))
+    finally:
+        torch.set_num_threads(previous_num_threads)
+    return {'metadata': metadata, 'results': results}
+
+# %% ../nbs/09_benchmark.ipynb 19
+def save_results(results:Dict[str, Any], # The output of `run_benchmarks`.
+                 path:Union[str, Path] # The path of the JSON file.
+                ) -> Path: # The path of the JSON file.
+    """
+    Save benchmark results as JSON.
+    """
+    path = Path(path)
+    path.write_text(json.dumps(results, indent=2))
+    return path
+
+# %% ../nbs/09_benchmark.ipynb 20
+def load_results(path:Union[str, Path] # The path of the JSON file.
+                ) -> Dict[str, Any]: # The benchmark results.
+    """
+    Load benchmark results saved with `save_results`.
+    """
+    return json.loads(Path(path).read_text())
+
+# %% ../nbs/09_benchmark.ipynb 21
+def compare_results(results:Dict[str, Any], # The current benchmark results.
+                    baseline:Dict[str, Any], # The baseline benchmark results.
+                    metrics:Sequence[str]=('p50_ms', 'peak_memory_bytes'), # The metrics to compare (lower is better).
+                    tolerance:float=0.1, # The relative change that counts as a regression or an improvement.
+                    min_abs_change:Optional[Dict[str, float]]=None # The absolute change below which a metric counts as unchanged. Defaults to 1 MiB for peak memory.
+                   ) -> List[Dict[str, Any]]: # A row for each benchmark case and metric.
+    """
+    Compare benchmark results with a baseline.
+
+    Each row holds the benchmark case, the metric, the baseline and current values, their ratio, and a status: 
+    `regression`, `improvement`, `unchanged`, `new` (not in the baseline) or `missing` (only in the baseline).
+    """
+    min_abs_change = {'peak_memory_bytes': 2**20} if min_abs_change is None else min_abs_change
+    current_results, baseline_results = results['results'], baseline['results']
+    names = list(current_results) + [name for name in baseline_results if name not in current_results]
+    
+    rows = []
+    for name in names:
+        for metric in metrics:
+            current, previous = current_results.get(name, {}).get(metric), baseline_results.get(name, {}).get(metric)
+            if current is None and previous is None:
+                continue
+            ratio = None
+            if previous is None:
+                status = 'new'
+            elif current is None:
+                status = 'missing'
+            else:
+                ratio = current / previous if previous > 0 else (1.0 if current == 0 else float('inf'))
+                if abs(current - previous) < min_abs_change.get(metric, 0):
+                    status = 'unchanged'
+                elif ratio > 1 + tolerance:
+                    status = 'regression'
+                elif ratio < 1 - tolerance:
+                    status = 'improvement'
+                else:
+                    status = 'unchanged'
+            rows.append({'name': name, 'metric': metric, 'baseline': previous, 'current': current, 'ratio': ratio, 'status': status})
+    return rows
+
+# %% ../nbs/09_benchmark.ipynb 22
+def format_comparison(rows:List[Dict[str, Any]], # The output of `compare_results`.
+                      only_changes:bool=False # Whether to leave out the unchanged rows.
+                     ) -> str: # The comparison as a plain-text table.
+    """
+    Format the output of `compare_results` as a plain-text table.
+    """
+    rows = [row for row in rows if row['status'] != 'unchanged'] if only_changes else rows
+    format_value = lambda value: '-' if value is None else f"{value:.3f}" if isinstance(value, float) else str(value)
+    name_width = max([len('name')] + [len(row['name']) for row in rows])
+    metric_width = max([len('metric')] + [len(row['metric']) for row in rows])
+    lines = [f"{'name':<{name_width}}  {'metric':<{metric_width}}  {'baseline':>14}  {'current':>14}  {'ratio':>7}  status"]
+    lines.append('-' * len(lines[0]))
+    for row in rows:
+        lines.append(f"{row['name']:<{name_width}}  {row['metric']:<{metric_width}}  {format_value(row['baseline']):>14}  "
+                     f"{format_value(row['current']):>14}  {format_value(row['ratio']):>7}  {row['status']}")
+    return '\n'.join(lines)
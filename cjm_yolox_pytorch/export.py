@@ -0,0 +1,180 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_export.ipynb.
+
+# %% auto 0
+__all__ = ['get_example_input', 'get_output_names', 'trace_wrapper', 'export_torchscript', 'export_onnx', 'load_onnx_model',
+           'check_export_parity']
+
+# %% ../nbs/07_export.ipynb 4
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from pathlib import Path
+
+# %% ../nbs/07_export.ipynb 5
+import torch
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# %% ../nbs/07_export.ipynb 6
+from .inference import YOLOXInferenceWrapper
+
+# %% ../nbs/07_export.ipynb 8
+def get_example_input(wrapper:YOLOXInferenceWrapper, # The inference wrapper.
+                      input_dims:Tuple[int, int], # The (height, width) of the input.
+                      batch_size:int=1, # The batch size of the input.
+                      dtype:torch.dtype=torch.float32 # The data type of the input (e.g., torch.uint8 for raw images).
+                     ) -> torch.Tensor: # A random input in the layout and value range the wrapper expects.
+    """
+    Create a random example input for tracing or exporting the wrapper.
+    """
+    shape = (batch_size, *input_dims, 3) if wrapper.channels_last else (batch_size, 3, *input_dims)
+    device = wrapper.strides.device
+    if not dtype.is_floating_point:
+        return torch.randint(0, 256, shape, dtype=dtype, device=device)
+    return torch.rand(shape, dtype=dtype, device=device) * (255 if wrapper.scale_inp else 1)
+
+# %% ../nbs/07_export.ipynb 9
+def get_output_names(wrapper:YOLOXInferenceWrapper # The inference wrapper.
+                    ) -> List[str]: # The names of the wrapper outputs.
+    """
+    Get the names of the outputs of the wrapper for the exported graph.
+    """
+    if wrapper.run_box_and_prob_calculation and wrapper.run_nms:
+        return ['boxes', 'scores', 'labels', 'num_detections']
+    return ['output']
+
+# %% ../nbs/07_export.ipynb 10
+def trace_wrapper(wrapper:YOLOXInferenceWrapper, # The inference wrapper.
+                  input_dims:Tuple[int, int], # The (height, width) of the example input.
+                  batch_size:int=1, # The batch size of the example input.
+                  bake_output_grids:bool=True, # Whether to bake the output grids for `input_dims` into the graph as constants.
+                  dtype:torch.dtype=torch.float32 # The data type of the example input.
+                 ) -> torch.jit.ScriptModule: # The traced wrapper.
+    """
+    Trace the wrapper with an example input.
+
+    With `bake_output_grids`, the graph holds the output grids as constants and only serves `input_dims`. 
+    Otherwise, the graph generates the output grids from the input shape, so it serves other resolutions too. 
+    Either way, the graph serves other batch sizes.
+    """
+    wrapper.eval()
+    example_input = get_example_input(wrapper, input_dims, batch_size, dtype)
+    
+    previous_bake_output_grids = wrapper.bake_output_grids
+    wrapper.bake_output_grids = bake_output_grids
+    if bake_output_grids:
+        # Fill the grid cache outside the trace so the graph holds the grids as constants
+        wrapper.get_output_grids(input_dims, example_input.device)
+    try:
+        with torch.no_grad():
+            traced = torch.jit.trace(wrapper, example_input, check_trace=False)
+    finally:
+        wrapper.bake_output_grids = previous_bake_output_grids
+    return traced
+
+# %% ../nbs/07_export.ipynb 11
+def export_torchscript(wrapper:YOLOXInferenceWrapper, # The inference wrapper.
+                       path:Union[str, Path], # The file path for the TorchScript model.
+                       input_dims:Tuple[int, int], # The (height, width) of the example input.
+                       batch_size:int=1, # The batch size of the example input.
+                       bake_output_grids:bool=True, # Whether to bake the output grids for `input_dims` into the graph as constants.
+                       dtype:torch.dtype=torch.float32, # The data type of the example input.
+                       freeze:bool=True # Whether to freeze the module, inlining the weights and attributes as constants.
+                      ) -> torch.jit.ScriptModule: # The exported module.
+    """
+    Export the wrapper to a TorchScript file (see `trace_wrapper`). Load it with `torch.jit.load`.
+    """
+    traced = trace_wrapper(wrapper, input_dims, batch_size, bake_output_grids, dtype)
+    if freeze:
+        traced = torch.jit.freeze(traced)
+    traced.save(str(path))
+    return traced
+
+# %% ../nbs/07_export.ipynb 12
+def export_onnx(wrapper:YOLOXInferenceWrapper, # The inference wrapper.
+                path:Union[str, Path], # The file path for the ONNX model.
+                input_dims:Tuple[int, int], # The (height, width) of the example input.
+                batch_size:int=1, # The batch size of the example input.
+                bake_output_grids:bool=True, # Whether to bake the output grids for `input_dims` into the graph as constants.
+                dtype:torch.dtype=torch.float32, # The data type of the example input.
+                opset_version:int=17 # The ONNX opset version.
+               ) -> Path: # The path of the ONNX model.
+    """
+    Export the wrapper to an ONNX file with an `input` and the outputs from `get_output_names`.
+
+    The export traces the wrapper (requires the `onnx` package). The batch size is a dynamic axis, 
+    and so are the height and width of the input without `bake_output_grids`. NMS exports as the ONNX `NonMaxSuppression` operator.
+    """
+    wrapper.eval()
+    example_input = get_example_input(wrapper, input_dims, batch_size, dtype)
+    output_names = get_output_names(wrapper)
+
+    input_axes = {0: 'batch'}
+    if not bake_output_grids:
+        input_axes.update({1: 'height', 2: 'width'} if wrapper.channels_last else {2: 'height', 3: 'width'})
+    dynamic_axes = {'input': input_axes, **{name: {0: 'batch'} for name in output_names}}
+    if output_names == ['output'] and not bake_output_grids:
+        dynamic_axes['output'][1] = 'num_proposals'
+
+    previous_bake_output_grids = wrapper.bake_output_grids
+    wrapper.bake_output_grids = bake_output_grids
+    if bake_output_grids:
+        # Fill the grid cache outside the trace so the graph holds the grids as constants
+        wrapper.get_output_grids(input_dims, example_input.device)
+    try:
+        with torch.no_grad():
+            torch.onnx.export(wrapper, (example_input,), str(path), input_names=['input'], output_names=output_names, 
+                              dynamic_axes=dynamic_axes, opset_version=opset_version, dynamo=False)
+    finally:
+        wrapper.bake_output_grids = previous_bake_output_grids
+    return Path(path)
+
+# %% ../nbs/07_export.ipynb 13
+def load_onnx_model(path:Union[str, Path], # The path of the ONNX model.
+                    providers:Optional[List[str]]=None # The ONNX Runtime execution providers. Defaults to the CPU.
+                   ) -> Callable: # A function that runs the model on a tensor and returns the outputs as tensors.
+    """
+    Load an ONNX model with ONNX Runtime (requires the `onnxruntime` package).
+    """
+    if onnxruntime is None:
+        raise ImportError("Running ONNX models requires the onnxruntime package")
+    session = onnxruntime.InferenceSession(str(path), providers=providers or ['CPUExecutionProvider'])
+
+    def run(x):
+        outputs = session.run(None, {'input': x.cpu().numpy()})
+        outputs = tuple(torch.from_numpy(output) for output in outputs)
+        return outputs[0] if len(outputs) == 1 else outputs
+    return run
+
+# %% ../nbs/07_export.ipynb 14
+def check_export_parity(wrapper:YOLOXInferenceWrapper, # The eager inference wrapper.
+                        exported:Union[Callable, str, Path], # The exported model, or the path of a TorchScript (.pt) or ONNX (.onnx) file.
+                        inputs:Union[torch.Tensor, List[torch.Tensor]], # The test inputs.
+                        rtol:float=1e-4, # The relative tolerance.
+                        atol:float=1e-4 # The absolute tolerance.
+                       ) -> Dict[str, float]: # The maximum absolute difference for each output.
+    """
+    Compare the outputs of an exported model with the eager wrapper, raising an `AssertionError` for outputs outside the tolerances.
+    """
+    if isinstance(exported, (str, Path)):
+        exported = load_onnx_model(exported) if Path(exported).suffix == '.onnx' else torch.jit.load(str(exported))
+    inputs = [inputs] if isinstance(inputs, torch.Tensor) else inputs
+    output_names = get_output_names(wrapper)
+
+    wrapper.eval()
+    max_diffs = {name: 0.0 for name in output_names}
+    mismatches = set()
+    with torch.no_grad():
+        for x in inputs:
+            expected, actual = wrapper(x), exported(x)
+            expected, actual = [output if isinstance(output, tuple) else (output,) for output in (expected, actual)]
+            for name, expected_output, actual_output in zip(output_names, expected, actual):
+                expected_output, actual_output = expected_output.float(), actual_output.to(expected_output.device).float()
+                assert actual_output.shape == expected_output.shape, f"Shape mismatch for {name}: {tuple(actual_output.shape)} vs {tuple(expected_output.shape)}"
+                max_diffs[name] = max(max_diffs[name], (actual_output - expected_output).abs().max().item())
+                if not torch.allclose(actual_output, expected_output, rtol=rtol, atol=atol):
+                    mismatches.add(name)
+    
+    assert not mismatches, f"The exported outputs differ from eager mode for {sorted(mismatches)}: {max_diffs}"
+    return max_diffs
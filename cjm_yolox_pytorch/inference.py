@@ -1,26 +1,117 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_inference.ipynb.
 
 # %% auto 0
-__all__ = ['YOLOXInferenceWrapper']
+__all__ = ['letterbox_images', 'unletterbox_boxes', 'get_tile_origins', 'YOLOXInferenceWrapper']
 
 # %% ../nbs/04_inference.ipynb 4
 import os
 from typing import Any, Type, List, Optional, Callable, Tuple
 from functools import partial
+from collections import OrderedDict
 
 from pathlib import Path
 
 # %% ../nbs/04_inference.ipynb 5
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
+import torchvision
 
 import torch.nn.init as init
 
 # %% ../nbs/04_inference.ipynb 6
 from .model import build_model, NORM_STATS
-from .utils import generate_output_grids
+from .utils import generate_output_grids, is_channels_last
 
 # %% ../nbs/04_inference.ipynb 8
+def letterbox_images(images, # A batch tensor of images, or a list of images with arbitrary sizes.
+                     target_dims:Optional[Tuple[int, int]]=None, # The (height, width) to fit the images into. Defaults to the size of the largest image.
+                     stride:int=32, # The largest output stride of the model. The padded height and width are multiples of it.
+                     pad_value:int=114, # The value for the padded area.
+                     channels_last:bool=False, # Whether the images have the channels as the last dimension.
+                     center:bool=False, # Whether to center the images in the padded area instead of placing them in the top-left corner.
+                     antialias:bool=True # Whether to apply an anti-aliasing filter when downscaling.
+                    ) -> Tuple[torch.Tensor, torch.Tensor]: # The padded batch and the letterbox parameters [B, 3] (scale, pad_x, pad_y).
+    """
+    Resize a batch of images to fit `target_dims` while keeping their aspect ratio, and pad them to a shared stride-aligned shape.
+
+    The images keep their data type (typically uint8), device, and layout. 
+    Images with the same size get resized and copied together, so a batch tensor takes a single resize and a single copy. 
+    Pass the letterbox parameters to `YOLOXInferenceWrapper` (or `unletterbox_boxes`) to map the boxes back to the original images.
+    """
+    # Group the images by size, keeping their batch indices
+    if isinstance(images, torch.Tensor):
+        groups = {tuple(images.shape[1:]): (slice(None), images)}
+    else:
+        indices = OrderedDict()
+        for i, image in enumerate(images):
+            indices.setdefault(tuple(image.shape), []).append(i)
+        groups = {shape: (idxs, torch.stack([images[i] for i in idxs])) for shape, idxs in indices.items()}
+    batch_size = images.shape[0] if isinstance(images, torch.Tensor) else len(images)
+    
+    # Use [N, C, H, W] views of the images (channels last images keep their memory format)
+    groups = [(idxs, group.permute(0, 3, 1, 2) if channels_last else group) for idxs, group in groups.values()]
+    image_dims = [group.shape[-2:] for _, group in groups]
+    num_channels, dtype, device = groups[0][1].shape[1], groups[0][1].dtype, groups[0][1].device
+    
+    # Scale the images to fit the target dimensions
+    if target_dims is None:
+        target_dims = (max(dims[0] for dims in image_dims), max(dims[1] for dims in image_dims))
+    scales = [min(target_dims[0] / dims[0], target_dims[1] / dims[1]) for dims in image_dims]
+    resized_dims = [(max(round(dims[0] * scale), 1), max(round(dims[1] * scale), 1)) for dims, scale in zip(image_dims, scales)]
+    
+    # Round the padded dimensions up to the stride
+    padded_dims = [-(-max(dims[i] for dims in resized_dims) // stride) * stride for i in range(2)]
+    if channels_last:
+        padded = torch.full((batch_size, *padded_dims, num_channels), pad_value, dtype=dtype, device=device).permute(0, 3, 1, 2)
+    else:
+        padded = torch.full((batch_size, num_channels, *padded_dims), pad_value, dtype=dtype, device=device)
+    letterbox_params = torch.empty(batch_size, 3, device=device)
+    
+    for (idxs, group), dims, scale, (height, width) in zip(groups, image_dims, scales, resized_dims):
+        if tuple(dims) != (height, width):
+            # Resize uint8 images directly on the CPU, and in float32 on other devices
+            if dtype == torch.uint8 and device.type != 'cpu':
+                group = F.interpolate(group.float(), size=(height, width), mode='bilinear', align_corners=False, antialias=antialias)
+                group = group.round_().clamp_(0, 255).to(dtype)
+            else:
+                group = F.interpolate(group, size=(height, width), mode='bilinear', align_corners=False, antialias=antialias)
+        
+        # Copy the resized images into the padded batch
+        pad_y, pad_x = ((padded_dims[0] - height) // 2, (padded_dims[1] - width) // 2) if center else (0, 0)
+        padded[idxs, :, pad_y:pad_y + height, pad_x:pad_x + width] = group
+        letterbox_params[idxs] = torch.tensor([scale, pad_x, pad_y], device=device)
+    
+    return (padded.permute(0, 2, 3, 1) if channels_last else padded), letterbox_params
+
+# %% ../nbs/04_inference.ipynb 9
+def unletterbox_boxes(boxes:torch.Tensor, # The bounding boxes in [x0, y0, w, h] format in the letterboxed images [B, N, 4].
+                      letterbox_params:torch.Tensor # The letterbox parameters from `letterbox_images` [B, 3].
+                     ) -> torch.Tensor: # The bounding boxes in the coordinates of the original images.
+    """
+    Map bounding boxes from letterboxed images back to the original images by removing the padding offset and undoing the scale.
+    """
+    scales, offsets = letterbox_params[:, None, :1], letterbox_params[:, None, 1:]
+    return torch.cat([(boxes[..., :2] - offsets) / scales, boxes[..., 2:4] / scales], dim=-1)
+
+# %% ../nbs/04_inference.ipynb 10
+def get_tile_origins(length:int, # The height or width of the image.
+                     tile_length:int, # The height or width of the tiles. Must be a multiple of `stride`.
+                     overlap:int=64, # The minimum overlap between neighboring tiles.
+                     stride:int=32 # The largest output stride of the model. The tile origins are multiples of it.
+                    ) -> List[int]: # The start coordinate of each tile along the dimension.
+    """
+    Get the stride-aligned start coordinates of overlapping tiles that cover an image dimension.
+
+    The last tile ends at the image length rounded up to the stride, so only the edge tiles need padding. 
+    Images shorter than a tile get a single tile.
+    """
+    assert tile_length % stride == 0, f"The tile length ({tile_length}) must be a multiple of the stride ({stride})"
+    step = max((tile_length - overlap) // stride * stride, stride)
+    last_origin = max(-(-length // stride) * stride - tile_length, 0)
+    return list(range(0, last_origin, step)) + [last_origin]
+
+# %% ../nbs/04_inference.ipynb 11
 class YOLOXInferenceWrapper(nn.Module):
     """
     This is a wrapper for the YOLOX <https://arxiv.org/abs/2107.08430> object detection model.
@@ -34,10 +125,24 @@ class YOLOXInferenceWrapper(nn.Module):
                  strides:Optional[List[int]]=[8, 16, 32], # The strides for the model.
                  scale_inp:bool=False, # Whether to scale the input by dividing by 255.
                  channels_last:bool=False, # Whether the input tensor has channels first.
-                 run_box_and_prob_calculation:bool=True # Whether to calculate the bounding boxes and their probabilities.
+                 run_box_and_prob_calculation:bool=True, # Whether to calculate the bounding boxes and their probabilities.
+                 run_nms:bool=False, # Whether to filter the bounding boxes with non-maximum suppression and return padded detections.
+                 score_threshold:float=0.25, # The minimum probability for a bounding box to count as a detection.
+                 iou_threshold:float=0.45, # The IoU threshold for non-maximum suppression.
+                 pre_nms_topk:int=1000, # The maximum number of bounding boxes per image to pass to non-maximum suppression.
+                 max_detections:int=100, # The maximum number of detections to return per image.
+                 max_cached_grids:int=8, # The maximum number of input resolutions to keep output grids (and output buffers) for.
+                 reuse_output_buffers:bool=False, # Whether to write the postprocessed output into a reusable preallocated buffer.
+                 fold_normalization:bool=False, # Whether to fold the input scaling and normalization into the first convolution of the model.
+                 channels_last_model:bool=False, # Whether to run the model in channels last memory format.
+                 bake_output_grids:bool=False # Whether tracing bakes the output grids for the traced input resolution into the graph as constants.
                 ):
         """
         Constructor for the YOLOXInferenceWrapper class.
+
+        With `fold_normalization`, the wrapper modifies the model in place (see `YOLOX.fold_normalization`) and passes the raw input straight to the model. 
+        With `channels_last_model`, the wrapper converts the model weights to channels last memory format in place, and scales and normalizes the input in a single pass. 
+        NHWC inputs (`channels_last=True`), such as uint8 frames from a video decoder, then go through the model as channels last views without an NCHW copy.
         """
         super().__init__()
         self.model = model
@@ -46,8 +151,26 @@ class YOLOXInferenceWrapper(nn.Module):
         self.scale_inp = scale_inp
         self.channels_last = channels_last
         self.register_buffer("strides", torch.tensor(strides))
+        self.output_strides = [int(stride) for stride in strides]
         self.run_box_and_prob_calculation = run_box_and_prob_calculation
+        self.run_nms = run_nms
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self.pre_nms_topk = pre_nms_topk
+        self.max_detections = max_detections
+        self.num_classes = model.bbox_head.cls_out_channels
+        self.max_cached_grids = max_cached_grids
+        self.output_grid_cache = OrderedDict()
+        self.reuse_output_buffers = reuse_output_buffers
+        self.output_buffer_cache = OrderedDict()
         self.input_dim_slice = slice(1, 3) if self.channels_last else slice(2, 4)
+        self.fold_normalization = fold_normalization
+        if self.fold_normalization:
+            self.model.fold_normalization(normalize_mean.flatten(), normalize_std.flatten(), 1/255 if scale_inp else 1.0)
+        self.channels_last_model = channels_last_model
+        self.bake_output_grids = bake_output_grids
+        if self.channels_last_model:
+            self.model.to(memory_format=torch.channels_last)
 
     def preprocess_input(self, x):
         """
@@ -59,17 +182,26 @@ class YOLOXInferenceWrapper(nn.Module):
         Returns:
         torch.Tensor: The preprocessed input tensor.
         """
+        # Permute the dimensions of the input to bring the channels to the front if required (this is a channels last view, not a copy)
+        if self.channels_last:
+            x = x.permute(0, 3, 1, 2)
+
+        if self.fold_normalization:
+            # The model scales and normalizes the raw input in its first convolution
+            return x
+
+        if self.channels_last_model:
+            # Scale and normalize the input in a single pass, (x * scale - mean) / std, which also converts integer inputs to float. 
+            # This matches the separate steps below up to float rounding.
+            input_scale = (1 / 255.0 if self.scale_inp else 1.0) / self.normalize_std
+            return torch.addcmul(-self.normalize_mean / self.normalize_std, x, input_scale)
+
         # Scale the input if required
         if self.scale_inp:
             x = x / 255.0
 
-        # Permute the dimensions of the input to bring the channels to the front if required
-        if self.channels_last:
-            x = x.permute(0, 3, 1, 2)
-
         # Normalize the input
-        x = (x - self.normalize_mean) / self.normalize_std
-        return x
+        return (x - self.normalize_mean) / self.normalize_std
         
     def process_output(self, model_output):
         """
@@ -81,8 +213,19 @@ class YOLOXInferenceWrapper(nn.Module):
         Returns:
         torch.Tensor: The postprocessed output tensor.
         """
+        if isinstance(model_output, torch.Tensor):
+            # The head already flattened the predictions (see `YOLOXHead.fuse_predictors`), so only apply sigmoid to the objectness and class scores
+            model_output[..., 4:].sigmoid_()
+            return model_output
+        
         cls_scores, bbox_preds, objectness = model_output
         
+        if self.reuse_output_buffers and not torch.jit.is_tracing() and not torch.compiler.is_compiling():
+            return self.process_output_into_buffer(cls_scores, bbox_preds, objectness)
+        
+        # Channels last outputs flatten to [B, H*W, C] views, so concatenate them along the grid cells instead
+        channels_last_output = is_channels_last(bbox_preds[0])
+        
         stride_flats = []
         # Iterate over the output strides
         for i in range(self.strides.shape[0]):
@@ -90,14 +233,83 @@ class YOLOXInferenceWrapper(nn.Module):
             bbox = bbox_preds[i]  # Get the bounding box predictions
             obj = torch.sigmoid(objectness[i])  # Apply sigmoid to the objectness scores
             cat = torch.cat((bbox, obj, cls), dim=1)  # Concatenate the bounding boxes, objectness, and class scores
-            flat = torch.flatten(cat, start_dim=2)  # Flatten the tensor from the second dimension
+            if channels_last_output:
+                flat = cat.permute(0, 2, 3, 1).flatten(1, 2)  # Flatten the grid cells of the channels last tensor
+            else:
+                flat = torch.flatten(cat, start_dim=2)  # Flatten the tensor from the second dimension
             stride_flats.append(flat)
 
+        if channels_last_output:
+            return torch.cat(stride_flats, dim=1)
+
         # Concatenate all the flattened tensors
         full_cat = torch.cat(stride_flats, dim=2)
         full_cat_out = full_cat.permute(0, 2, 1)  # Permute the dimensions of the tensor
         return full_cat_out
 
+    def get_output_buffer(self, batch_size, num_cells, num_channels, dtype, device):
+        """
+        Get a reusable buffer for the postprocessed output from the cache, allocating it if needed.
+
+        The cache keeps the buffers for the most recently used `max_cached_grids` batch sizes and resolutions.
+
+        Parameters:
+        batch_size (int): The batch size.
+        num_cells (int): The number of output grid cells across all strides.
+        num_channels (int): The number of values for each grid cell.
+        dtype (torch.dtype): The data type of the buffer.
+        device (torch.device): The device of the buffer.
+
+        Returns:
+        torch.Tensor: A buffer with shape [batch_size, num_cells, num_channels].
+        """
+        key = (batch_size, num_cells, num_channels, dtype, torch.device(device))
+        if key in self.output_buffer_cache:
+            # Mark the buffer as the most recently used one
+            self.output_buffer_cache.move_to_end(key)
+            return self.output_buffer_cache[key]
+
+        output_buffer = torch.empty(key[:3], dtype=dtype, device=device)
+        if self.max_cached_grids > 0:
+            self.output_buffer_cache[key] = output_buffer
+            # Evict the least recently used buffers
+            while len(self.output_buffer_cache) > self.max_cached_grids:
+                self.output_buffer_cache.popitem(last=False)
+        return output_buffer
+
+    def process_output_into_buffer(self, cls_scores, bbox_preds, objectness):
+        """
+        Postprocess the output of the model into a reusable buffer (see `get_output_buffer`).
+
+        Each stride is written straight into its slice of the buffer, and the sigmoid is applied in place, 
+        so there are no new allocations once the buffer exists. 
+        The returned tensor is overwritten by the next call with the same batch size and resolution.
+
+        Parameters:
+        cls_scores (list): The class scores for each stride.
+        bbox_preds (list): The bounding box predictions for each stride.
+        objectness (list): The objectness scores for each stride.
+
+        Returns:
+        torch.Tensor: The postprocessed output tensor.
+        """
+        num_cells = [bbox_pred.shape[2] * bbox_pred.shape[3] for bbox_pred in bbox_preds]
+        output = self.get_output_buffer(bbox_preds[0].shape[0], sum(num_cells), 5 + cls_scores[0].shape[1], 
+                                        bbox_preds[0].dtype, bbox_preds[0].device)
+
+        start = 0
+        for cls, bbox, obj, num in zip(cls_scores, bbox_preds, objectness, num_cells):
+            # Copy the bounding boxes, objectness, and class scores of the stride into its slice of the buffer
+            output_slice = output[:, start:start + num]
+            output_slice[..., :4].copy_(torch.flatten(bbox, start_dim=2).transpose(1, 2))
+            output_slice[..., 4:5].copy_(torch.flatten(obj, start_dim=2).transpose(1, 2))
+            output_slice[..., 5:].copy_(torch.flatten(cls, start_dim=2).transpose(1, 2))
+            start += num
+
+        # Apply sigmoid to the objectness and class scores in place
+        output[..., 4:].sigmoid_()
+        return output
+
     def calculate_boxes_and_probs(self, model_output, output_grids):
         """
         Calculate the bounding boxes and their probabilities.
@@ -126,12 +338,255 @@ class YOLOXInferenceWrapper(nn.Module):
 
         return torch.stack([x0, y0, w, h, labels.float(), max_probs], dim=-1)
 
-    def forward(self, x):
+    def postprocess_detections(self, boxes_and_probs):
+        """
+        Filter the bounding boxes with a score threshold, pre-NMS top-k, class-aware non-maximum suppression, and a maximum number of detections per image.
+
+        The outputs have a fixed shape for a given input, so this step stays traceable and exportable. 
+        Padding entries have zero boxes and scores, and a label of -1.
+
+        Parameters:
+        boxes_and_probs (torch.Tensor): The output of `calculate_boxes_and_probs`, shape [B, N, 6].
+
+        Returns:
+        tuple: The boxes in [x0, y0, w, h] format [B, max_detections, 4], scores [B, max_detections], labels [B, max_detections], and the number of detections per image [B].
+        """
+        if torch.jit.is_tracing() or boxes_and_probs.shape[1] < self.pre_nms_topk:
+            # Pad the proposals with entries that score below any threshold, so the top-k size does not depend on the number of proposals.
+            # Traced graphs then serve any input resolution, since the number of proposals follows it.
+            padding = boxes_and_probs.new_full((boxes_and_probs.shape[0], self.pre_nms_topk, boxes_and_probs.shape[2]), -1)
+            boxes_and_probs = torch.cat((boxes_and_probs, padding), dim=1)
+        num_candidates = self.pre_nms_topk
+        num_detections = min(self.max_detections, num_candidates)
+
+        # Keep the top-k bounding boxes per image
+        top_scores, top_idxs = boxes_and_probs[..., 5].topk(num_candidates, dim=1)
+        candidates = boxes_and_probs.gather(1, top_idxs.unsqueeze(-1).expand(-1, -1, boxes_and_probs.shape[-1]))
+        xyxy_boxes = torch.cat((candidates[..., :2], candidates[..., :2] + candidates[..., 2:4]), dim=-1)
+        labels = candidates[..., 4].long()
+
+        # Run one class-aware non-maximum suppression over the whole batch, with a separate group for each image and class.
+        # Only the candidates above the score threshold take part, since the others could only suppress lower scoring candidates.
+        # The padding entries stay out even with a threshold of zero or below.
+        # The image indices come from a cumsum rather than the batch size, so traced graphs serve any batch size.
+        image_idxs = torch.ones_like(labels[:, :1]).cumsum(dim=0) - 1
+        group_idxs = (image_idxs * self.num_classes + labels).flatten()
+        nms_idxs = ((top_scores >= self.score_threshold) & (labels >= 0)).flatten().nonzero().squeeze(1)
+        keep = torchvision.ops.batched_nms(xyxy_boxes.flatten(0, 1)[nms_idxs], top_scores.flatten()[nms_idxs], group_idxs[nms_idxs], self.iou_threshold)
+
+        # Mark the kept candidates of each image
+        keep_mask = torch.zeros_like(top_scores, dtype=torch.bool)
+        keep_mask.view(-1)[nms_idxs[keep]] = True
+
+        # Sort the kept candidates by score and take the top detections
+        det_scores, det_idxs = top_scores.masked_fill(~keep_mask, -1).topk(num_detections, dim=1)
+        det_mask = det_scores >= 0
+        det_boxes = candidates[..., :4].gather(1, det_idxs.unsqueeze(-1).expand(-1, -1, 4)) * det_mask.unsqueeze(-1)
+        det_labels = labels.gather(1, det_idxs).masked_fill(~det_mask, -1)
+        det_scores = det_scores.masked_fill(~det_mask, 0)
+        num_dets = det_mask.sum(dim=1)
+
+        # Pad the detections to the maximum number of detections
+        pad = self.max_detections - num_detections
+        if pad > 0:
+            det_boxes = F.pad(det_boxes, (0, 0, 0, pad))
+            det_scores = F.pad(det_scores, (0, pad))
+            det_labels = F.pad(det_labels, (0, pad), value=-1)
+
+        return det_boxes, det_scores, det_labels, num_dets
+
+    def get_output_grids(self, input_dims, device):
+        """
+        Get the output grids for an input resolution from the cache, generating them on the target device if needed.
+
+        The cache keeps the output grids for the most recently used `max_cached_grids` resolutions. 
+        Under `torch.compile`, the output grids get generated inside the graph instead, so one graph with a dynamic resolution serves every input size. 
+        The same goes for tracing, unless `bake_output_grids` is set, in which case the traced graph holds the cached grids as constants.
+
+        Parameters:
+        input_dims (tuple): The height and width of the input.
+        device (torch.device): The device for the output grids.
+
+        Returns:
+        torch.Tensor: The output grids.
+        """
+        if torch.jit.is_tracing() and not self.bake_output_grids:
+            # Keep the output grids in the traced graph so they follow the input resolution
+            return generate_output_grids(*input_dims, self.strides).to(device)
+
+        if torch.compiler.is_compiling():
+            # Use Python strides, since grid sizes computed from the strides buffer would depend on tensor data
+            return generate_output_grids(*input_dims, self.output_strides).to(device)
+
+        key = (int(input_dims[0]), int(input_dims[1]), torch.device(device))
+        if key in self.output_grid_cache:
+            # Mark the resolution as the most recently used one
+            self.output_grid_cache.move_to_end(key)
+            return self.output_grid_cache[key]
+
+        output_grids = generate_output_grids(*key[:2], self.output_strides).to(device)
+        if self.max_cached_grids > 0:
+            self.output_grid_cache[key] = output_grids
+            # Evict the least recently used resolutions
+            while len(self.output_grid_cache) > self.max_cached_grids:
+                self.output_grid_cache.popitem(last=False)
+        return output_grids
+
+    def warmup_output_grids(self, input_dims_list, device=None):
+        """
+        Generate and cache the output grids for a known set of input resolutions.
+
+        Parameters:
+        input_dims_list (list): The (height, width) of each input resolution.
+        device (torch.device, optional): The device for the output grids. Defaults to the device of the wrapper.
+        """
+        device = self.strides.device if device is None else device
+        for input_dims in input_dims_list:
+            self.get_output_grids(input_dims, device)
+
+    def letterbox(self, 
+                  images, # A batch tensor of images, or a list of images with arbitrary sizes.
+                  target_dims:Optional[Tuple[int, int]]=None, # The (height, width) to fit the images into.
+                  **kwargs # Additional arguments for `letterbox_images`.
+                 ) -> Tuple[torch.Tensor, torch.Tensor]: # The padded batch and the letterbox parameters.
+        """
+        Letterbox a batch of images to a shape that is a multiple of the largest stride, using the input layout of the wrapper (see `letterbox_images`).
+        """
+        return letterbox_images(images, target_dims, stride=max(self.output_strides), channels_last=self.channels_last, **kwargs)
+
+    def decode_output(self, x, input_dims, letterbox_params=None):
+        """
+        Calculate the bounding boxes and their probabilities from the postprocessed model output, and filter them into detections if required.
+
+        Parameters:
+        x (torch.Tensor): The output of `process_output`.
+        input_dims (tuple): The height and width of the input.
+        letterbox_params (torch.Tensor, optional): The letterbox parameters from `letterbox`. When provided, the bounding boxes get mapped back to the original images.
+
+        Returns:
+        torch.Tensor or tuple: The output of `calculate_boxes_and_probs`, or of `postprocess_detections` with `run_nms`.
+        """
+        # Get the output grids for the input resolution
+        output_grids = self.get_output_grids(input_dims, x.device)
+        # Calculate the bounding boxes and their probabilities
+        x = self.calculate_boxes_and_probs(x, output_grids)
+
+        if letterbox_params is not None:
+            # Map the bounding boxes back to the original images (NMS is unaffected by the scale and offset)
+            x = torch.cat([unletterbox_boxes(x[..., :4], letterbox_params.to(x.dtype)), x[..., 4:]], dim=-1)
+
+        if self.run_nms:
+            # Filter the bounding boxes into padded detections for each image
+            x = self.postprocess_detections(x)
+        return x
+
+    def crop_tile(self, image, tile_origin, tile_dims, pad_value=114):
+        """
+        Crop a tile from an image in the input layout of the wrapper, padding the bottom and right if the tile extends past the image edges.
+
+        Parameters:
+        image (torch.Tensor): An image without the batch dimension.
+        tile_origin (tuple): The (y, x) coordinates of the top-left corner of the tile.
+        tile_dims (tuple): The height and width of the tile.
+        pad_value (int): The value for the padded area.
+
+        Returns:
+        torch.Tensor: The tile (a view of the image when it needs no padding).
+        """
+        (y0, x0), (tile_height, tile_width) = tile_origin, tile_dims
+        if self.channels_last:
+            tile = image[y0:y0 + tile_height, x0:x0 + tile_width]
+            pad = (0, 0, 0, tile_width - tile.shape[1], 0, tile_height - tile.shape[0])
+        else:
+            tile = image[:, y0:y0 + tile_height, x0:x0 + tile_width]
+            pad = (0, tile_width - tile.shape[2], 0, tile_height - tile.shape[1])
+        return F.pad(tile, pad, value=pad_value) if any(pad) else tile
+
+    def merge_tile_detections(self, candidates):
+        """
+        Merge the bounding boxes from the tiles of each image with class-aware non-maximum suppression and keep the top detections.
+
+        Parameters:
+        candidates (list): For each image, a list of bounding boxes and their probabilities in image coordinates, in the format returned by `calculate_boxes_and_probs` [N, 6].
+
+        Returns:
+        tuple: The detections in the format returned by `postprocess_detections`.
+        """
+        candidates = [torch.cat(image_candidates) for image_candidates in candidates]
+        batch_size, dtype, device = len(candidates), candidates[0].dtype, candidates[0].device
+        det_boxes = torch.zeros(batch_size, self.max_detections, 4, dtype=dtype, device=device)
+        det_scores = torch.zeros(batch_size, self.max_detections, dtype=dtype, device=device)
+        det_labels = torch.full((batch_size, self.max_detections), -1, dtype=torch.long, device=device)
+        num_dets = torch.zeros(batch_size, dtype=torch.long, device=device)
+        
+        for i, image_candidates in enumerate(candidates):
+            xyxy_boxes = torch.cat((image_candidates[:, :2], image_candidates[:, :2] + image_candidates[:, 2:4]), dim=-1)
+            labels = image_candidates[:, 4].long()
+            # Suppress the duplicate bounding boxes from overlapping tiles (batched_nms sorts the kept boxes by score)
+            keep = torchvision.ops.batched_nms(xyxy_boxes, image_candidates[:, 5], labels, self.iou_threshold)[:self.max_detections]
+            num_dets[i] = keep.numel()
+            det_boxes[i, :keep.numel()] = image_candidates[keep, :4]
+            det_scores[i, :keep.numel()] = image_candidates[keep, 5]
+            det_labels[i, :keep.numel()] = labels[keep]
+        
+        return det_boxes, det_scores, det_labels, num_dets
+
+    def tiled_forward(self, images, tile_dims=(640, 640), overlap=64, tile_batch_size=8, pad_value=114):
+        """
+        Detect objects in high-resolution images by running the model on overlapping tiles and merging the detections across the tile seams.
+
+        The tiles have stride-aligned origins (see `get_tile_origins`) and go through the model `tile_batch_size` at a time, 
+        so peak memory depends on the tile size and batch size instead of the image size. 
+        Only the tiles get copied to the device of the wrapper, so the images can stay in CPU memory. 
+        Each tile keeps its top `pre_nms_topk` bounding boxes above `score_threshold`, shifted to image coordinates, 
+        and class-aware non-maximum suppression merges the bounding boxes of each image into at most `max_detections` detections.
+
+        Parameters:
+        images (torch.Tensor): A batch of images in the input layout of the wrapper.
+        tile_dims (tuple): The height and width of the tiles. Both must be multiples of the largest stride.
+        overlap (int): The minimum overlap between neighboring tiles in pixels.
+        tile_batch_size (int): The maximum number of tiles per forward pass.
+        pad_value (int): The value for padding the tiles that extend past the image edges.
+
+        Returns:
+        tuple: The detections in the format returned by `postprocess_detections`, with the bounding boxes in image coordinates.
+        """
+        stride = max(self.output_strides)
+        image_height, image_width = images.shape[self.input_dim_slice]
+        tile_origins = [(y0, x0) for y0 in get_tile_origins(image_height, tile_dims[0], overlap, stride) 
+                        for x0 in get_tile_origins(image_width, tile_dims[1], overlap, stride)]
+        tiles = [(i, tile_origin) for i in range(images.shape[0]) for tile_origin in tile_origins]
+        
+        device = self.strides.device
+        output_grids = self.get_output_grids(tile_dims, device)
+        candidates = [[] for _ in range(images.shape[0])]
+        
+        for start in range(0, len(tiles), tile_batch_size):
+            tile_batch = tiles[start:start + tile_batch_size]
+            # Copy the tiles of the batch to the device
+            x = torch.stack([self.crop_tile(images[i], tile_origin, tile_dims, pad_value) for i, tile_origin in tile_batch]).to(device)
+            
+            x = self.process_output(self.model(self.preprocess_input(x)))
+            x = self.calculate_boxes_and_probs(x, output_grids)
+            
+            # Keep the top bounding boxes of each tile and shift them to image coordinates
+            top_scores, top_idxs = x[..., 5].topk(min(self.pre_nms_topk, x.shape[1]), dim=1)
+            x = x.gather(1, top_idxs.unsqueeze(-1).expand(-1, -1, x.shape[-1]))
+            tile_offsets = torch.tensor([[x0, y0] for _, (y0, x0) in tile_batch], dtype=x.dtype, device=device)
+            x[..., :2] += tile_offsets[:, None]
+            
+            for (i, _), tile_candidates, tile_scores in zip(tile_batch, x, top_scores):
+                candidates[i].append(tile_candidates[tile_scores >= self.score_threshold])
+        
+        return self.merge_tile_detections(candidates)
+
+    def forward(self, x, letterbox_params=None):
         """
         The forward method for the YOLOXInferenceWrapper class.
 
         Parameters:
         x (torch.Tensor): The input tensor.
+        letterbox_params (torch.Tensor, optional): The letterbox parameters from `letterbox`. When provided, the bounding boxes get mapped back to the original images.
 
         Returns:
         torch.Tensor: The output tensor.
@@ -147,9 +602,7 @@ class YOLOXInferenceWrapper(nn.Module):
         x = self.process_output(x)
         
         if self.run_box_and_prob_calculation:
-            # Generate output grids
-            output_grids = generate_output_grids(*input_dims, self.strides).to(x.device)
-            # Calculate the bounding boxes and their probabilities
-            x = self.calculate_boxes_and_probs(x, output_grids)
+            # Calculate the bounding boxes and their probabilities, and filter them if required
+            x = self.decode_output(x, input_dims, letterbox_params)
         
         return x
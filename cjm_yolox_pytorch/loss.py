@@ -6,6 +6,7 @@ __all__ = ['SamplingResult', 'YOLOXLoss']
 # %% ../nbs/02_loss.ipynb 3
 from typing import Any, Type, List, Optional, Callable, Tuple, Union, Dict
 from functools import partial
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 
 # %% ../nbs/02_loss.ipynb 4
@@ -17,7 +18,7 @@ import torchvision
 
 # %% ../nbs/02_loss.ipynb 5
 from .utils import multi_apply, generate_output_grids
-from .simota import AssignResult, SimOTAAssigner
+from .simota import AssignResult, SimOTAAssigner, pad_ground_truths
 
 # %% ../nbs/02_loss.ipynb 7
 @dataclass
@@ -78,6 +79,9 @@ class YOLOXLoss:
     7. If using L1 loss, concatenate L1 targets, computes the L1 loss, scale it by its weight, and normalize it by the total number of samples.
     8. Return a dictionary containing the computed losses.
     
+    With `use_batch_assign=True`, the loss compiles into a single graph with `torch.compile(fullgraph=True)`. 
+    The number of positive samples depends on the predictions, so this needs `torch._dynamo.config.capture_scalar_outputs` and `capture_dynamic_output_shape_ops`.
+    
     Based on OpenMMLab's implementation in the mmdetection library:
     
     - [OpenMMLab's Implementation](https://github.com/open-mmlab/mmdetection/blob/d64e719172335fa3d7a757a2a3636bd19e9efb62/mmdet/models/dense_heads/yolox_head.py#L321)
@@ -90,7 +94,9 @@ class YOLOXLoss:
                  objectness_loss_weight:float=1.0, # The weight for the loss function to calculate the objectness loss.
                  l1_loss_weight:float=1.0, # The weight for the loss function to calculate the L1 loss.
                  use_l1:bool=False, # Whether to use L1 loss in the calculation.
-                 strides:List[int]=[8,16,32] # The list of strides.
+                 strides:List[int]=[8,16,32], # The list of strides.
+                 use_batch_assign:bool=False, # Whether to assign ground truths for the whole batch at once with `SimOTAAssigner.batch_assign`.
+                 amp_safe:bool=True # Whether to compute the loss in float32 when the predictions are float16 or bfloat16 (e.g., from a forward pass under `torch.autocast`).
                 ):
         
         """
@@ -115,6 +121,8 @@ class YOLOXLoss:
         self.l1_loss_weight = l1_loss_weight
         
         self.use_l1 = use_l1
+        self.use_batch_assign = use_batch_assign
+        self.amp_safe = amp_safe
         
         # Initialize the assigner
         self.assigner = SimOTAAssigner(center_radius=2.5)
@@ -179,17 +187,96 @@ class YOLOXLoss:
         return l1_target
 
 
+    def get_batch_assignment_results(self, 
+                                     class_preds:torch.Tensor, # The predicted class probabilities for the batch.
+                                     objectness_scores:torch.Tensor, # The predicted objectness scores for the batch.
+                                     output_grid_boxes:torch.Tensor, # The output grid boxes.
+                                     decoded_bboxes:torch.Tensor, # The decoded bounding boxes for the batch.
+                                     ground_truth_bboxes:List[torch.Tensor], # A list of ground truth boxes for each image.
+                                     ground_truth_labels:List[torch.Tensor], # A list of ground truth labels for each image.
+                                     padded_ground_truths:Optional[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]=None # The ground truths already padded by `pad_ground_truths`, to skip padding them again.
+                                    ) -> List[AssignResult]: # The assignment result for each image.
+        """
+        Assigns ground truth objects to output grid boxes for every image in the batch at once. 
+        The ground truths are padded to a common size, and the results match those `get_target_single` computes per image.
+        """
+        # Pad the ground truths and match their dtype to the dtype of decoded bounding boxes
+        if padded_ground_truths is None:
+            padded_ground_truths = pad_ground_truths(ground_truth_bboxes, ground_truth_labels)
+        padded_bboxes, padded_labels, gt_mask = padded_ground_truths
+        padded_bboxes = padded_bboxes.to(decoded_bboxes.dtype)
+
+        # Calculate the offset for the prior boxes
+        offset_output_grid_boxes = torch.cat([output_grid_boxes[:, :2] + output_grid_boxes[:, 2:] * 0.5, output_grid_boxes[:, 2:]], dim=-1)
+
+        return self.assigner.batch_assign(
+            class_preds.sigmoid() * objectness_scores.unsqueeze(-1).sigmoid(),
+            offset_output_grid_boxes, decoded_bboxes, padded_bboxes, padded_labels, gt_mask)
+
+
+    def get_batch_targets(self, 
+                          class_preds:torch.Tensor, # The predicted class probabilities for the batch.
+                          objectness_scores:torch.Tensor, # The predicted objectness scores for the batch.
+                          output_grid_boxes:torch.Tensor, # The output grid boxes.
+                          decoded_bboxes:torch.Tensor, # The decoded bounding boxes for the batch.
+                          ground_truth_bboxes:List[torch.Tensor], # A list of ground truth boxes for each image.
+                          ground_truth_labels:List[torch.Tensor], # A list of ground truth labels for each image.
+                          assignment_results:Optional[List[AssignResult]]=None # Precomputed assignment results for each image (e.g., from `get_batch_assignment_results`).
+                         ) -> Tuple: # The flat indices of the positive samples in the batch, and the targets for classification, objectness, bounding boxes, and L1 (if applicable).
+        """
+        Calculates the targets for every image in the batch at once, from the assignment results of `get_batch_assignment_results` (unless assignment results are provided). 
+        The positive samples come in the same order as the targets `get_target_single` computes per image and `__call__` concatenates, 
+        so the losses are the same without a loop over images.
+        """
+        batch_size, num_output_grid_boxes = decoded_bboxes.shape[:2]
+
+        # Pad the ground truths once for the assignment and the bounding box targets
+        padded_ground_truths = pad_ground_truths(ground_truth_bboxes, ground_truth_labels)
+
+        # Assign ground truth objects to output grid boxes, and stack the assignment results of each image
+        if assignment_results is None:
+            assignment_results = self.get_batch_assignment_results(
+                class_preds, objectness_scores, output_grid_boxes, decoded_bboxes, ground_truth_bboxes, ground_truth_labels, padded_ground_truths)
+        assigned_gt_indices = torch.stack([result.ground_truth_box_indices for result in assignment_results])
+        assigned_labels = torch.stack([result.category_labels for result in assignment_results])
+        max_iou_values = torch.stack([result.max_iou_values for result in assignment_results])
+
+        # Get the flat indices of the positive samples, and their image and output grid box indices
+        foreground_mask = assigned_gt_indices.view(-1) > 0
+        positive_indices = foreground_mask.nonzero().squeeze(-1)
+        image_indices = positive_indices // num_output_grid_boxes
+        grid_box_indices = positive_indices % num_output_grid_boxes
+
+        # Generate class targets
+        class_targets = F.one_hot(assigned_labels.view(-1)[positive_indices], self.num_classes) * max_iou_values.view(-1)[positive_indices].unsqueeze(-1)
+
+        # Set the objectness targets to 1 for the positive samples
+        objectness_targets = foreground_mask.unsqueeze(-1).to(objectness_scores.dtype)
+
+        # Generate bounding box targets from the padded ground truth boxes
+        padded_bboxes = padded_ground_truths[0]
+        bbox_targets = padded_bboxes.to(decoded_bboxes.dtype)[image_indices, assigned_gt_indices.view(-1)[positive_indices] - 1]
+
+        # Initialize L1 targets as zeros, and calculate them if use_l1 is True
+        l1_targets = class_preds.new_zeros((positive_indices.size(0), 4))
+        if self.use_l1:
+            l1_targets = self.get_l1_target(l1_targets, bbox_targets, output_grid_boxes[grid_box_indices])
+
+        return positive_indices, class_targets, objectness_targets, bbox_targets, l1_targets
+
+
     def get_target_single(self, 
                           class_preds:torch.Tensor, # The predicted class probabilities.
                           objectness_score:torch.Tensor, # The predicted objectness scores.
                           output_grid_boxes:torch.Tensor, # The output grid boxes.
                           decoded_bboxes:torch.Tensor, # The decoded bounding boxes.
                           ground_truth_bboxes:torch.Tensor, # The ground truth boxes.
-                          ground_truth_labels:torch.Tensor # The ground truth labels.
+                          ground_truth_labels:torch.Tensor, # The ground truth labels.
+                          assignment_result:Optional[AssignResult]=None # A precomputed assignment result for the image (e.g., from `get_batch_assignment_results`).
                          ) -> Tuple: # The targets for classification, objectness, bounding boxes, and L1 (if applicable), along with the foreground mask and the number of positive samples.
         """
         Calculates the targets for a single image. 
-        It assigns ground truth objects to output grid boxes and samples output grid boxes based on the assignment results. 
+        It assigns ground truth objects to output grid boxes (unless an assignment result is provided) and samples output grid boxes based on the assignment results. 
         It then generates class targets, objectness targets, bounding box targets, and, optionally, L1 targets.
         """
         # Get the number of prior boxes and ground truth labels
@@ -215,9 +302,10 @@ class YOLOXLoss:
 
         
         # Assign ground truth objects to prior boxes and get assignment results
-        assignment_result = self.assigner.assign(
-            class_preds.sigmoid() * objectness_score.unsqueeze(1).sigmoid(),
-            offset_output_grid_boxes, decoded_bboxes, ground_truth_bboxes, ground_truth_labels)
+        if assignment_result is None:
+            assignment_result = self.assigner.assign(
+                class_preds.sigmoid() * objectness_score.unsqueeze(1).sigmoid(),
+                offset_output_grid_boxes, decoded_bboxes, ground_truth_bboxes, ground_truth_labels)
         
         # Use assignment results to sample prior boxes
         sampling_result = self.sample(assignment_result, output_grid_boxes, ground_truth_bboxes)
@@ -282,65 +370,84 @@ class YOLOXLoss:
         These losses are scaled by their respective weights and normalized by the total number of samples.
         """
         
-        # Get the number of images in the batch
-        batch_size = class_scores[0].shape[0]
+        # With `amp_safe`, promote half precision predictions to float32 and keep autocast from casting the loss computation back. 
+        # Box decoding (exp), the assignment costs (log IoU), the GIoU loss (eps=1e-16) and the summed BCE losses all overflow or underflow in float16, 
+        # while the predictions are small next to the model activations, so only the model forward runs in half precision.
+        loss_context = nullcontext()
+        if self.amp_safe:
+            class_scores, predicted_bboxes, objectness_scores = ([t.float() for t in tensors] for tensors in (class_scores, predicted_bboxes, objectness_scores))
+            loss_context = torch.autocast(class_scores[0].device.type, enabled=False)
         
-        # Generate box coordinates for all grid priors.
-        output_grid_boxes = generate_output_grids(*[s*self.strides[0] for s in class_scores[0].shape[-2:]], self.strides)
-        output_grid_boxes[:, :2] *= output_grid_boxes[:, 2].unsqueeze(1)
-        flatten_output_grid_boxes = torch.cat([output_grid_boxes, output_grid_boxes[:, 2:].clone()], dim=1)
+        with loss_context:
+            # Get the number of images in the batch
+            batch_size = class_scores[0].shape[0]
         
-        # Flatten and concatenate class predictions, bounding box predictions, and objectness scores
-        flatten_class_preds = self.flatten_and_concat(class_scores, batch_size, self.num_classes)
-        flatten_bbox_preds = self.flatten_and_concat(predicted_bboxes, batch_size, 4)
-        flatten_objectness_scores = self.flatten_and_concat(objectness_scores, batch_size)
+            # Generate box coordinates for all grid priors.
+            output_grid_boxes = generate_output_grids(*[s*self.strides[0] for s in class_scores[0].shape[-2:]], self.strides)
+            output_grid_boxes[:, :2] *= output_grid_boxes[:, 2].unsqueeze(1)
+            flatten_output_grid_boxes = torch.cat([output_grid_boxes, output_grid_boxes[:, 2:].clone()], dim=1)
+        
+            # Flatten and concatenate class predictions, bounding box predictions, and objectness scores
+            flatten_class_preds = self.flatten_and_concat(class_scores, batch_size, self.num_classes)
+            flatten_bbox_preds = self.flatten_and_concat(predicted_bboxes, batch_size, 4)
+            flatten_objectness_scores = self.flatten_and_concat(objectness_scores, batch_size)
                     
-        # Concatenate and decode box predictions
-        flatten_output_grid_boxes = flatten_output_grid_boxes.to(flatten_bbox_preds.device)
-        flatten_decoded_bboxes = self.bbox_decode(flatten_output_grid_boxes, flatten_bbox_preds)
-
-        # Compute targets
-        (positive_masks, class_targets, objectness_targets, bbox_targets, l1_targets,
-         num_positive_images) = multi_apply(
-             self.get_target_single, flatten_class_preds.detach(),
-             flatten_objectness_scores.detach(),
-             flatten_output_grid_boxes.unsqueeze(0).repeat(batch_size, 1, 1),
-             flatten_decoded_bboxes.detach(), ground_truth_bboxes, ground_truth_labels)
-
-        # Concatenate all positive masks, class targets, objectness targets, and bounding box targets
-        positive_masks = torch.cat(positive_masks, 0)
-        class_targets = torch.cat(class_targets, 0)
-        objectness_targets = torch.cat(objectness_targets, 0)
-        bbox_targets = torch.cat(bbox_targets, 0)
-
-        # Compute bounding box loss
-        loss_bbox = self.bbox_loss_func(flatten_decoded_bboxes.view(-1, 4)[positive_masks], bbox_targets)
-
-        # Compute objectness loss
-        loss_obj = self.objectness_loss_func(flatten_objectness_scores.view(-1, 1), objectness_targets)
-
-        # Compute class loss
-        loss_cls = self.class_loss_func(flatten_class_preds.view(-1, self.num_classes)[positive_masks],class_targets)
+            # Concatenate and decode box predictions
+            flatten_output_grid_boxes = flatten_output_grid_boxes.to(flatten_bbox_preds.device)
+            flatten_decoded_bboxes = self.bbox_decode(flatten_output_grid_boxes, flatten_bbox_preds)
+
+            # Compute targets, either for the whole batch at once or for each image
+            if self.use_batch_assign:
+                positive_indices, class_targets, objectness_targets, bbox_targets, l1_targets = self.get_batch_targets(
+                    flatten_class_preds.detach(), flatten_objectness_scores.detach(), flatten_output_grid_boxes, 
+                    flatten_decoded_bboxes.detach(), ground_truth_bboxes, ground_truth_labels)
+            else:
+                # The output grid boxes are the same for every image, so pass an expanded view instead of a copy per image
+                (positive_masks, class_targets, objectness_targets, bbox_targets, l1_targets,
+                 _) = multi_apply(
+                     self.get_target_single, flatten_class_preds.detach(),
+                     flatten_objectness_scores.detach(),
+                     flatten_output_grid_boxes.expand(batch_size, -1, -1),
+                     flatten_decoded_bboxes.detach(), ground_truth_bboxes, ground_truth_labels)
+
+                # Concatenate all positive masks, class targets, objectness targets, bounding box targets, and L1 targets
+                positive_indices = torch.cat(positive_masks, 0).nonzero().squeeze(-1)
+                class_targets = torch.cat(class_targets, 0)
+                objectness_targets = torch.cat(objectness_targets, 0)
+                bbox_targets = torch.cat(bbox_targets, 0)
+                l1_targets = torch.cat(l1_targets, 0)
+
+            # Gather the positive predictions once, using the same indices for every loss term
+            positive_decoded_bboxes = flatten_decoded_bboxes.view(-1, 4)[positive_indices]
+            positive_class_preds = flatten_class_preds.view(-1, self.num_classes)[positive_indices]
+
+            # Compute bounding box loss
+            loss_bbox = self.bbox_loss_func(positive_decoded_bboxes, bbox_targets)
+
+            # Compute objectness loss
+            loss_obj = self.objectness_loss_func(flatten_objectness_scores.view(-1, 1), objectness_targets)
+
+            # Compute class loss
+            loss_cls = self.class_loss_func(positive_class_preds, class_targets)
         
-        # Calculate total number of samples
-        num_total_samples = max(sum(num_positive_images), 1)
+            # Calculate total number of samples
+            num_total_samples = max(positive_indices.size(0), 1)
         
-        # Scale losses
-        loss_bbox = (loss_bbox * self.bbox_loss_weight) / num_total_samples
-        loss_obj = (loss_obj * self.objectness_loss_weight) / num_total_samples
-        loss_cls = (loss_cls * self.class_loss_weight) / num_total_samples
+            # Scale losses
+            loss_bbox = (loss_bbox * self.bbox_loss_weight) / num_total_samples
+            loss_obj = (loss_obj * self.objectness_loss_weight) / num_total_samples
+            loss_cls = (loss_cls * self.class_loss_weight) / num_total_samples
         
-        # Initialize loss dictionary
-        loss_dict = dict(loss_cls=loss_cls, loss_bbox=loss_bbox, loss_obj=loss_obj)
-
-        # If use_l1 is True, concatenate l1 targets, compute L1 loss and add it to the loss dictionary
-        if self.use_l1:
-            l1_targets = torch.cat(l1_targets, 0)
-            loss_l1 = self.l1_loss_func(
-                flatten_bbox_preds.view(-1, 4)[positive_masks],
-                l1_targets) / num_total_samples
-            loss_l1 *= self.l1_loss_weight
-            loss_dict.update(loss_l1=loss_l1)
-
-        # Return loss dictionary
-        return loss_dict
+            # Initialize loss dictionary
+            loss_dict = dict(loss_cls=loss_cls, loss_bbox=loss_bbox, loss_obj=loss_obj)
+
+            # If use_l1 is True, compute L1 loss and add it to the loss dictionary
+            if self.use_l1:
+                loss_l1 = self.l1_loss_func(
+                    flatten_bbox_preds.view(-1, 4)[positive_indices],
+                    l1_targets) / num_total_samples
+                loss_l1 *= self.l1_loss_weight
+                loss_dict.update(loss_l1=loss_l1)
+
+            # Return loss dictionary
+            return loss_dict
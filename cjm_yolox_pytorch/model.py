@@ -1,12 +1,20 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_model.ipynb.
 
 # %% auto 0
-__all__ = ['MODEL_TYPES', 'CSP_DARKNET_CFGS', 'PAFPN_CFGS', 'HEAD_CFGS', 'HUGGINGFACE_CKPT_URL', 'PRETRAINED_URLS', 'NORM_CFG',
-           'NORM_STATS', 'MODEL_CFGS', 'ConvModule', 'DarknetBottleneck', 'CSPLayer', 'Focus', 'SPPBottleneck',
-           'CSPDarknet', 'YOLOXPAFPN', 'YOLOXHead', 'YOLOX', 'init_head', 'build_model']
+__all__ = ['MODEL_TYPES', 'CSP_DARKNET_CFGS', 'PAFPN_CFGS', 'HEAD_CFGS', 'HUGGINGFACE_CKPT_URL', 'PRETRAINED_URLS',
+           'PRETRAINED_SHA256', 'NORM_CFG', 'NORM_STATS', 'MODEL_CFGS', 'ConvModule', 'DarknetBottleneck', 'CSPLayer',
+           'Focus', 'SPPBottleneck', 'CSPDarknet', 'YOLOXPAFPN', 'YOLOXHead', 'YOLOX', 'init_head',
+           'download_checkpoint', 'file_sha256', 'get_checkpoint', 'load_checkpoint', 'build_model']
 
 # %% ../nbs/00_model.ipynb 4
 import os
+import copy
+import shutil
+import hashlib
+import inspect
+import tempfile
+import contextlib
+import urllib.request
 from typing import Any, Type, List, Optional, Callable, Tuple
 from functools import partial
 
@@ -15,11 +23,13 @@ from pathlib import Path
 # %% ../nbs/00_model.ipynb 5
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 
 import torch.nn.init as init
+from torch.nn.utils.fusion import fuse_conv_bn_weights
 
 # %% ../nbs/00_model.ipynb 6
-from .utils import multi_apply
+from .utils import multi_apply, is_channels_last
 
 # %% ../nbs/00_model.ipynb 8
 MODEL_TYPES = ['yolox_tiny', 'yolox_s', 'yolox_m', 'yolox_l', 'yolox_x']
@@ -58,6 +68,9 @@ PRETRAINED_URLS = {
     MODEL_TYPES[4]:f'{HUGGINGFACE_CKPT_URL}/yolox_x.pth',
 }
 
+# The expected SHA-256 digests of the pretrained checkpoints (None for checkpoints without a pinned digest yet)
+PRETRAINED_SHA256 = {model_type:None for model_type in MODEL_TYPES}
+
 NORM_CFG = dict(momentum=0.03, eps=0.001)
 
 NORM_STATS = {
@@ -85,6 +98,9 @@ class ConvModule(nn.Module):
         2. Pass the output from the convolutional layer (now stored in x) through the batch normalization layer and store the result back to x.
         3. Apply the activation function to the output of the batch normalization layer (x) and return the result.
 
+    After calling `fuse` in evaluation mode, the forward pass uses a single convolution with the batch normalization folded into its weights. 
+    The fused weights stay out of the state dict, and switching to training mode (e.g., before fine-tuning) calls `unfuse` to go back to the separate layers.
+    Call `fuse` again after loading new weights.
     """
 
     def __init__(self, 
@@ -109,11 +125,45 @@ class ConvModule(nn.Module):
         self.bn = nn.BatchNorm2d(out_channels, eps=eps, momentum=momentum, affine=affine, track_running_stats=track_running_stats)
         # Activation function
         self.activate = activation_function()
+        # Convolution weights with the batch normalization folded in (set by `fuse`)
+        self.register_buffer('fused_weight', None, persistent=False)
+        self.register_buffer('fused_bias', None, persistent=False)
         
         init.kaiming_normal_(self.conv.weight.data, mode='fan_out', nonlinearity='relu')
 
+    def fuse(self) -> None:
+        """
+        Fold the batch normalization layer into the weights of the convolutional layer, using the running statistics.
+        """
+        if self.training:
+            raise RuntimeError("ConvModule.fuse() requires evaluation mode, since the fused weights use the running statistics. Call eval() first.")
+        with torch.no_grad():
+            fused_weight, fused_bias = fuse_conv_bn_weights(self.conv.weight, self.conv.bias, 
+                                                            self.bn.running_mean, self.bn.running_var, self.bn.eps, 
+                                                            self.bn.weight, self.bn.bias)
+        # Store plain tensors, since assigning parameters would register them in the state dict
+        self.fused_weight, self.fused_bias = fused_weight.detach(), fused_bias.detach()
+
+    def unfuse(self) -> None:
+        """
+        Remove the fused weights, so the forward pass uses the separate convolution and batch normalization layers again.
+        """
+        self.fused_weight = None
+        self.fused_bias = None
+
+    def train(self, mode: bool = True):
+        if mode:
+            # Train the separate layers, since the fused weights are a copy that would not get updated
+            self.unfuse()
+        return super().train(mode)
+
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         
+        if self.fused_weight is not None:
+            # Pass input through the fused convolution and apply the activation function
+            return self.activate(F.conv2d(x, self.fused_weight, self.fused_bias, 
+                                          self.conv.stride, self.conv.padding, self.conv.dilation, self.conv.groups))
+        
         # Pass input through convolutional layer
         x = self.conv(x)
         # Pass output from convolutional layer through batch normalization
@@ -253,6 +303,9 @@ class Focus(nn.Module):
     Based on OpenMMLab's implementation in the mmdetection library:
     
     - [OpenMMLab's Implementation](https://github.com/open-mmlab/mmdetection/blob/d64e719172335fa3d7a757a2a3636bd19e9efb62/mmdet/models/backbones/csp_darknet.py#L14)
+
+    After calling `fold_normalization`, the forward pass takes raw (e.g., uint8) images and applies the input scaling and normalization through the convolution weights. 
+    The folded weights stay out of the state dict. Call `unfold_normalization` to go back to normalized inputs.
     """
     
     def __init__(self,
@@ -279,8 +332,75 @@ class Focus(nn.Module):
             momentum=momentum,
             affine=affine,
             track_running_stats=track_running_stats)
+        # Convolution weights with the input normalization folded in (set by `fold_normalization`)
+        self.register_buffer('folded_weight', None, persistent=False)
+        self.register_buffer('folded_bias', None, persistent=False)
+        self.register_buffer('input_pad_values', None, persistent=False)
+
+    def fold_normalization(self, 
+                           mean:List[float], # The mean values for normalization.
+                           std:List[float], # The standard deviation values for normalization.
+                           scale:float=1/255 # The scale to apply to the raw input values before normalization.
+                          ) -> None:
+        """
+        Fold the input scaling and normalization, `(x * scale - mean) / std`, into copies of the weights and bias of the convolution.
+
+        The convolution zero-pads its normalized input, so the folded forward pass pads the raw input with the values that normalize to zero instead.
+        """
+        mean, std = [torch.as_tensor(stat, dtype=torch.float32).flatten() for stat in (mean, std)]
+        # The patches are stacked along the channel dimension, so repeat the per-channel stats for each patch
+        input_scale = (scale / std).repeat(4)
+        input_shift = (mean / std).repeat(4)
+        
+        weight = self.conv.conv.weight.detach()
+        bias = self.conv.conv.bias
+        bias = bias.detach() if bias is not None else torch.zeros(weight.shape[0], dtype=weight.dtype, device=weight.device)
+        self.folded_weight = weight * input_scale.to(weight)[None, :, None, None]
+        self.folded_bias = bias - (weight * input_shift.to(weight)[None, :, None, None]).sum(dim=(1, 2, 3))
+        self.input_pad_values = (input_shift / input_scale).to(self.conv.conv.weight.device)
+
+    def unfold_normalization(self) -> None:
+        """
+        Remove the folded weights, so the forward pass takes normalized inputs again.
+        """
+        self.folded_weight = None
+        self.folded_bias = None
+        self.input_pad_values = None
+
+    def focus_raw_input(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Stack the patches of a raw input into a tensor with the padding of the convolution, converting the input to the dtype of the weights on the way.
+        """
+        height, width = x.shape[-2] // 2, x.shape[-1] // 2
+        padding = self.conv.conv.padding[0]
+        num_channels = x.shape[1]
+        weight = self.folded_weight
+        pad_values = self.input_pad_values.to(weight.dtype).view(1, -1, 1, 1)
+        
+        # Keep the memory format of the input (e.g., channels last images)
+        memory_format = torch.channels_last if is_channels_last(x) else torch.contiguous_format
+        focused = torch.empty(x.shape[0], num_channels * 4, height + 2 * padding, width + 2 * padding, 
+                              dtype=weight.dtype, device=x.device, memory_format=memory_format)
+        # Fill the border with the raw input values that normalize to zero
+        focused[..., :padding, :] = pad_values
+        focused[..., height + padding:, :] = pad_values
+        focused[..., :, :padding] = pad_values
+        focused[..., :, width + padding:] = pad_values
+        
+        # Copy the top left, top right, bottom left, and bottom right patches into the interior
+        patches = (x[..., ::2, ::2], x[..., ::2, 1::2], x[..., 1::2, ::2], x[..., 1::2, 1::2])
+        for i, patch in enumerate(patches):
+            focused[:, i * num_channels:(i + 1) * num_channels, padding:height + padding, padding:width + padding] = patch
+        return focused
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
+        
+        if self.folded_weight is not None:
+            # Pass the padded patches of the raw input through the folded convolution. 
+            # The batch normalization stays separate, so the folded weights hold whether or not the convolution module is fused.
+            conv = self.conv.conv
+            x = F.conv2d(self.focus_raw_input(x), self.folded_weight, self.folded_bias, conv.stride, 0, conv.dilation, conv.groups)
+            return self.conv.activate(self.conv.bn(x))
                 
         # Split the input tensor into 4 patches
         patch_top_left = x[..., ::2, ::2]   # Top left patch
@@ -575,6 +695,8 @@ class YOLOXHead(nn.Module):
     
     The head takes as input feature maps at multiple scale levels (e.g., from a feature pyramid network) and outputs predicted class scores, bounding box coordinates, and objectness scores for each scale level.
     
+    For inference, `fuse_predictors` merges the regression and objectness predictors. The head then returns a single tensor in the flattened layout from `forward_fused`.
+    
     Based on OpenMMLab's implementation in the mmdetection library:
     
     - [OpenMMLab's Implementation](https://github.com/open-mmlab/mmdetection/blob/d64e719172335fa3d7a757a2a3636bd19e9efb62/mmdet/models/dense_heads/yolox_head.py#L20)
@@ -603,6 +725,8 @@ class YOLOXHead(nn.Module):
         self.strides = strides
         self.momentum = momentum
         self.eps = eps
+        # Merged regression and objectness predictors for each scale level (set by `fuse_predictors`)
+        self.multi_level_conv_reg_obj = None
         
         # Initialize the layers of the model
         self._init_layers()
@@ -678,10 +802,67 @@ class YOLOXHead(nn.Module):
 
         return cls_score, bbox_pred, objectness
 
+    def fuse_predictors(self):
+        """
+        Merge the regression and objectness predictors of each scale level into a single convolution for inference.
+        
+        The classification predictor reads a separate feature map, so it stays on its own.
+        """
+        self.multi_level_conv_reg_obj = nn.ModuleList()
+        for conv_reg, conv_obj in zip(self.multi_level_conv_reg, self.multi_level_conv_obj):
+            conv_reg_obj = nn.Conv2d(self.feat_channels, self.BBOX_DIM + self.OBJECTNESS_DIM, 1).to(conv_reg.weight)
+            with torch.no_grad():
+                conv_reg_obj.weight.copy_(torch.cat((conv_reg.weight, conv_obj.weight)))
+                conv_reg_obj.bias.copy_(torch.cat((conv_reg.bias, conv_obj.bias)))
+            self.multi_level_conv_reg_obj.append(conv_reg_obj)
+
+    def unfuse_predictors(self):
+        """
+        Remove the merged predictors, so the head returns separate outputs for each scale level again.
+        """
+        self.multi_level_conv_reg_obj = None
+
+    def forward_fused(self, feats):
+        """
+        Forward pass with the merged predictors from `fuse_predictors`.
+        
+        The predictions for every scale level go straight into one tensor with shape [B, N, 4 + 1 + num_classes], 
+        holding the raw bounding box, objectness, and class predictions for all N grid cells.
+        """
+        num_reg_obj = self.BBOX_DIM + self.OBJECTNESS_DIM
+        num_cells = [feat.shape[2] * feat.shape[3] for feat in feats]
+        num_channels = num_reg_obj + self.cls_out_channels
+        # Channels last predictions flatten to [B, H*W, C] views, so write them into a [B, N, C] output directly
+        channels_last = is_channels_last(feats[0])
+        if channels_last:
+            output = feats[0].new_empty((feats[0].shape[0], sum(num_cells), num_channels)).permute(0, 2, 1)
+        else:
+            output = feats[0].new_empty((feats[0].shape[0], num_channels, sum(num_cells)))
+        
+        def flatten(pred):
+            return pred.permute(0, 2, 3, 1).flatten(1, 2).transpose(1, 2) if channels_last else torch.flatten(pred, start_dim=2)
+        
+        start = 0
+        for feat, num, cls_convs, reg_convs, conv_cls, conv_reg_obj in zip(feats, num_cells,
+                                                                            self.multi_level_cls_convs,
+                                                                            self.multi_level_reg_convs,
+                                                                            self.multi_level_conv_cls,
+                                                                            self.multi_level_conv_reg_obj):
+            # Write the flattened predictions of the scale level into its slice of the output
+            output[:, :num_reg_obj, start:start + num] = flatten(conv_reg_obj(reg_convs(feat)))
+            output[:, num_reg_obj:, start:start + num] = flatten(conv_cls(cls_convs(feat)))
+            start += num
+        
+        return output.permute(0, 2, 1)
+
     def forward(self, feats):
         """
         Forward pass for the head.
         """
+        # Use the merged predictors if available
+        if self.multi_level_conv_reg_obj is not None:
+            return self.forward_fused(feats)
+        
         # Apply the forward_single function to each scale level
         return multi_apply(self.forward_single, feats,
                            self.multi_level_cls_convs,
@@ -690,7 +871,7 @@ class YOLOXHead(nn.Module):
                            self.multi_level_conv_reg,
                            self.multi_level_conv_obj)
 
-# %% ../nbs/00_model.ipynb 30
+# %% ../nbs/00_model.ipynb 32
 class YOLOX(nn.Module):
     """
     Implementation of `YOLOX: Exceeding YOLO Series in 2021`
@@ -705,6 +886,8 @@ class YOLOX(nn.Module):
     3. Pass the updated x through the bbox_head module. The bbox_head module predicts bounding boxes for potential objects in the images using the aggregated features. Update 'x' with the new output.
     4. Return 'x' as the final output. The final 'x' represents the model's predictions for object locations within the input images.
 
+    Call `fuse` to fold the batch normalization layers into the convolutions for faster inference, and `unfuse` to revert it (e.g., before fine-tuning). 
+    Call `fold_normalization` with the `NORM_STATS` entry for the model type to feed raw images straight into the backbone.
     """
     def __init__(self, 
                  backbone:CSPDarknet, # Backbone module for feature extraction.
@@ -728,7 +911,43 @@ class YOLOX(nn.Module):
 
         return x
 
-# %% ../nbs/00_model.ipynb 33
+    def fuse(self):
+        """
+        Fold the batch normalization layer of every `ConvModule` into its convolution weights.
+        """
+        for module in self.modules():
+            if isinstance(module, ConvModule):
+                module.fuse()
+        return self
+
+    def unfuse(self):
+        """
+        Restore the separate convolution and batch normalization layers of every `ConvModule`.
+        """
+        for module in self.modules():
+            if isinstance(module, ConvModule):
+                module.unfuse()
+        return self
+
+    def fold_normalization(self, 
+                           mean:List[float], # The mean values for normalization.
+                           std:List[float], # The standard deviation values for normalization.
+                           scale:float=1/255 # The scale to apply to the raw input values before normalization.
+                          ):
+        """
+        Fold the input scaling and normalization into the first convolution of the backbone (see `Focus.fold_normalization`).
+        """
+        self.backbone.stem.fold_normalization(mean, std, scale)
+        return self
+
+    def unfold_normalization(self):
+        """
+        Restore the first convolution of the backbone, so the model takes normalized inputs again.
+        """
+        self.backbone.stem.unfold_normalization()
+        return self
+
+# %% ../nbs/00_model.ipynb 43
 def init_head(head: YOLOXHead, # The YOLOX head to be initialized.
               num_classes: int # The number of classes in the dataset.
              ) -> None:
@@ -755,17 +974,112 @@ def init_head(head: YOLOXHead, # The YOLOX head to be initialized.
     
     head.multi_level_conv_cls = nn.ModuleList(conv_layers)
 
-# %% ../nbs/00_model.ipynb 37
-from cjm_psl_utils.core import download_file
+# %% ../nbs/00_model.ipynb 47
+def download_checkpoint(url:str, # The URL of the checkpoint.
+                        file_path:str, # The path to save the checkpoint to.
+                        chunk_size:int=2**20 # The number of bytes to read at a time.
+                       ) -> None:
+    """
+    Download a checkpoint to a file, raising an `IOError` when the download fails or ends early.
+    """
+    with urllib.request.urlopen(url) as response, open(file_path, 'wb') as file:
+        expected_size = int(response.headers.get('content-length', 0))
+        shutil.copyfileobj(response, file, chunk_size)
+        size = file.tell()
+    if expected_size != 0 and size != expected_size:
+        raise IOError(f"The download of {url} ended after {size} of {expected_size} bytes.")
+
+# %% ../nbs/00_model.ipynb 48
+def file_sha256(file_path:str, # The path to the file.
+                chunk_size:int=2**20 # The number of bytes to read at a time.
+               ) -> str: # The hexadecimal SHA-256 digest of the file.
+    """
+    Compute the SHA-256 digest of a file without reading it into memory all at once.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(partial(file.read, chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+# %% ../nbs/00_model.ipynb 49
+def get_checkpoint(url:str, # The URL of the checkpoint.
+                   checkpoint_dir:str, # Directory to store checkpoints.
+                   expected_sha256:Optional[str]=None # The expected SHA-256 digest of the checkpoint.
+                  ) -> str: # The path to the local checkpoint.
+    """
+    Get the path to a local copy of a checkpoint, only downloading it when there is no valid local copy.
+    
+    A local checkpoint is valid when its digest matches `expected_sha256`, or the digest stored next to it in a `<checkpoint>.sha256` file if `expected_sha256` is not given. 
+    A local checkpoint without either digest (e.g., copied in by hand) gets used as is, without storing a digest for it. 
+    Downloads go to a temporary file that only replaces the checkpoint once it is complete and matches `expected_sha256`, and then the digest gets stored.
+    """
+    checkpoint_path = os.path.join(checkpoint_dir, Path(url).name)
+    digest_path = Path(f"{checkpoint_path}.sha256")
+    
+    if os.path.exists(checkpoint_path):
+        stored_digest = digest_path.read_text().strip() if digest_path.exists() else None
+        expected_digest = expected_sha256 or stored_digest
+        if expected_digest is None:
+            # There is nothing to verify the checkpoint against, so skip the download without vouching for it
+            return checkpoint_path
+        digest = file_sha256(checkpoint_path)
+        if digest == expected_digest:
+            if stored_digest != digest:
+                digest_path.write_text(digest)
+            # Skip the download
+            return checkpoint_path
+        print(f"The SHA-256 digest of {checkpoint_path} does not match. Downloading a new copy.")
+    
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    # Download to a temporary file in the same directory, so the final rename is atomic
+    part_file = tempfile.NamedTemporaryFile(dir=checkpoint_dir, suffix='.part', delete=False)
+    part_file.close()
+    try:
+        download_checkpoint(url, part_file.name)
+        digest = file_sha256(part_file.name)
+        if expected_sha256 is not None and digest != expected_sha256:
+            raise ValueError(f"The SHA-256 digest of the download from {url} ({digest}) does not match the expected digest ({expected_sha256}).")
+        os.replace(part_file.name, checkpoint_path)
+    finally:
+        if os.path.exists(part_file.name):
+            os.remove(part_file.name)
+    digest_path.write_text(digest)
+    
+    return checkpoint_path
 
-# %% ../nbs/00_model.ipynb 38
+# %% ../nbs/00_model.ipynb 50
+def load_checkpoint(checkpoint_path:str, # The path to the checkpoint.
+                    mmap:bool=True # Whether to memory-map the checkpoint instead of reading it into memory.
+                   ) -> dict: # The state dict in the checkpoint.
+    """
+    Load the state dict from a checkpoint onto the CPU.
+    
+    With `mmap`, the tensors stay backed by the file, so their data only gets read when it is used (e.g., by `load_state_dict`). 
+    This falls back to a regular load for PyTorch versions and checkpoint formats that do not support memory-mapping.
+    """
+    if mmap:
+        try:
+            return torch.load(checkpoint_path, map_location='cpu', mmap=True)
+        except (TypeError, RuntimeError):
+            pass
+    return torch.load(checkpoint_path, map_location='cpu')
+
+# %% ../nbs/00_model.ipynb 52
 def build_model(model_type:str, # Type of the model to be built.
                 num_classes:int, # Number of classes for the model.
                 pretrained:bool=True, # Whether to load pretrained weights.
-                checkpoint_dir:str='./pretrained_checkpoints/' # Directory to store checkpoints.
+                checkpoint_dir:str='./pretrained_checkpoints/', # Directory to store checkpoints.
+                checkpoint_sha256:Optional[str]=None, # The expected SHA-256 digest of the pretrained checkpoint. Defaults to the `PRETRAINED_SHA256` entry for the model type.
+                mmap:bool=True, # Whether to memory-map the pretrained checkpoint when loading it.
+                skip_init:bool=True # Whether to skip initializing the weights that the pretrained checkpoint overwrites.
                ) -> YOLOX: # The built YOLOX model.
     """
     Builds a YOLOX model based on the given parameters.
+    
+    Pretrained checkpoints are only downloaded when there is no valid local copy (see `get_checkpoint`). 
+    With `skip_init`, pretrained models get built on the meta device and take the checkpoint tensors directly (requires PyTorch 2.1+). 
+    Errors while downloading or loading the checkpoint propagate to the caller.
     """
     
     assert model_type in MODEL_TYPES, f"Invalid model_type. Expected one of: {MODEL_TYPES}, but got {model_type}"
@@ -774,34 +1088,32 @@ def build_model(model_type:str, # Type of the model to be built.
     neck_cfg = PAFPN_CFGS[model_type]
     head_cfg = HEAD_CFGS[model_type]
     
-    backbone = CSPDarknet(**backbone_cfg)
-    neck = YOLOXPAFPN(**neck_cfg)
-
     if pretrained and PRETRAINED_URLS[model_type] == None:
         print("The selected model type does not have a pretrained checkpoint. Initializing model with untrained weights.")
         pretrained = False
     
-    try:
-        if pretrained:
-            url = PRETRAINED_URLS[model_type]
-            checkpoint_path = os.path.join(checkpoint_dir, Path(url).name)
-            download_file(url, checkpoint_dir)
-            
-            state_dict = torch.load(checkpoint_path, map_location='cpu')
-            num_pretrained_classes = state_dict['bbox_head.multi_level_conv_cls.0.weight'].shape[0]
-            
-            head = YOLOXHead(num_classes=num_pretrained_classes, **head_cfg)
-        else:
-            head = YOLOXHead(num_classes=num_classes, **head_cfg)
+    # Skipping initialization relies on `load_state_dict(assign=True)`
+    skip_init = pretrained and skip_init and 'assign' in inspect.signature(nn.Module.load_state_dict).parameters
+    
+    if pretrained:
+        checkpoint_path = get_checkpoint(PRETRAINED_URLS[model_type], checkpoint_dir, checkpoint_sha256 or PRETRAINED_SHA256[model_type])
         
+        state_dict = load_checkpoint(checkpoint_path, mmap)
+        num_pretrained_classes = state_dict['bbox_head.multi_level_conv_cls.0.weight'].shape[0]
+    
+    # Build the model on the meta device when the checkpoint overwrites every weight
+    with torch.device('meta') if skip_init else contextlib.nullcontext():
+        backbone = CSPDarknet(**backbone_cfg)
+        neck = YOLOXPAFPN(**neck_cfg)
+        head = YOLOXHead(num_classes=num_pretrained_classes if pretrained else num_classes, **head_cfg)
         yolox = YOLOX(backbone, neck, head)
-        
-        if pretrained:
+    
+    if pretrained:
+        if skip_init:
+            # Use the checkpoint tensors as the model weights
+            yolox.load_state_dict(state_dict, assign=True)
+        else:
             yolox.load_state_dict(state_dict)
-            init_head(head, num_classes)
-            
-    except Exception as e:
-        print(f"Error occurred while building the model: {str(e)}")
-        return None
+        init_head(head, num_classes)
 
     return yolox
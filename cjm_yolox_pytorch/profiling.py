@@ -0,0 +1,298 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/08_profiling.ipynb.
+
+# %% auto 0
+__all__ = ['PROFILED_METHODS', 'get_activation_bytes', 'count_module_flops', 'LayerProfiler']
+
+# %% ../nbs/08_profiling.ipynb 4
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Optional, Sequence, Union
+from pathlib import Path
+from functools import partial, wraps
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# %% ../nbs/08_profiling.ipynb 5
+import torch
+import torch.nn as nn
+
+# %% ../nbs/08_profiling.ipynb 6
+from .model import ConvModule, Focus
+
+# %% ../nbs/08_profiling.ipynb 8
+# The post-processing steps of `YOLOXInferenceWrapper` and the top-down and bottom-up paths of `YOLOXPAFPN`
+PROFILED_METHODS = ('preprocess_input', 'process_output', 'calculate_boxes_and_probs', 'postprocess_detections', '_top_down', '_bottom_up')
+
+# %% ../nbs/08_profiling.ipynb 9
+def get_activation_bytes(output:Any # A module output: a tensor, or nested tuples, lists and dictionaries of tensors.
+                        ) -> int: # The total size of the tensors in bytes.
+    """
+    Get the total size in bytes of the tensors in a module output.
+    """
+    if isinstance(output, torch.Tensor):
+        return output.numel() * output.element_size()
+    if isinstance(output, (tuple, list)):
+        return sum(get_activation_bytes(item) for item in output)
+    if isinstance(output, dict):
+        return sum(get_activation_bytes(item) for item in output.values())
+    return 0
+
+# %% ../nbs/08_profiling.ipynb 10
+def count_module_flops(module:nn.Module, # A module.
+                       output:Any # The output of the module.
+                      ) -> int: # The floating point operations of the module call.
+    """
+    Estimate the floating point operations of a convolution or linear layer from its output, counting a multiply-add as two operations.
+
+    Fused `ConvModule`s and `Focus` modules with folded normalization call `F.conv2d` directly, so they count the convolution they stand in for. 
+    Other layers count as zero, since the convolutions dominate the cost of the model.
+    """
+    if not isinstance(output, torch.Tensor):
+        return 0
+    if isinstance(module, ConvModule):
+        return count_module_flops(module.conv, output) if module.fused_weight is not None else 0
+    if isinstance(module, Focus):
+        return count_module_flops(module.conv.conv, output) if module.folded_weight is not None else 0
+    if isinstance(module, nn.Conv2d):
+        return 2 * output.numel() * (module.in_channels // module.groups) * module.kernel_size[0] * module.kernel_size[1]
+    if isinstance(module, nn.Linear):
+        return 2 * output.numel() * module.in_features
+    return 0
+
+# %% ../nbs/08_profiling.ipynb 11
+class LayerProfiler:
+    """
+    An opt-in profiler that records the time, FLOPs and activation size of every module and post-processing step of a model.
+
+    The profiler only registers its hooks while enabled (see `enable`, or use it as a context manager), so the model runs without any overhead otherwise.
+    Modules get labeled with their names in the model (e.g., `backbone.stage1` or `bbox_head.multi_level_cls_convs.0`), and the root module with its class name.
+    Methods from `methods` get labeled with the name of their module followed by the method name (e.g., `neck._top_down` or `process_output`).
+    The FLOPs and times of a module include its submodules and methods, including the ones deeper than `max_depth`.
+    """
+
+    def __init__(self,
+                 model:nn.Module, # The model (e.g., a `YOLOX` model or a `YOLOXInferenceWrapper`).
+                 max_depth:Optional[int]=None, # The maximum depth of the profiled modules in the module tree (the root has depth 0). Defaults to every module.
+                 methods:Sequence[str]=PROFILED_METHODS, # The names of the module methods to profile, for the modules that have them.
+                 synchronize:bool=True, # Whether to synchronize CUDA around each measurement, so the times cover the GPU work.
+                 max_samples:int=10000, # The number of recent times to keep for each label for the percentiles.
+                 max_events:int=100000 # The number of recent calls to keep for the Chrome trace.
+                ):
+        self.model = model
+        self.max_depth = max_depth
+        self.methods = methods
+        self.synchronize = synchronize and torch.cuda.is_available()
+        self.max_samples = max_samples
+        self.max_events = max_events
+        self.handles = []
+        self.patched_methods = []
+        self.frames = threading.local()
+        self.lock = threading.Lock()
+        self.reset()
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the profiler hooks are registered.
+        """
+        return len(self.handles) > 0 or len(self.patched_methods) > 0
+
+    def reset(self):
+        """
+        Clear the recorded statistics and trace events.
+        """
+        with self.lock:
+            self.durations = OrderedDict()
+            self.totals = {}
+            self.events = deque(maxlen=self.max_events)
+            self.start_time_ns = time.perf_counter_ns()
+
+    def enable(self):
+        """
+        Register the forward hooks on the modules and wrap the profiled methods.
+
+        Returns:
+        LayerProfiler: The profiler.
+        """
+        if self.enabled:
+            return self
+        for name, module in self.model.named_modules():
+            depth = name.count('.') + 1 if name else 0
+            if self.max_depth is not None and depth > self.max_depth:
+                if isinstance(module, (nn.Conv2d, nn.Linear, ConvModule, Focus)):
+                    # Count the FLOPs of the deeper layers towards the enclosing profiled module
+                    self.handles.append(module.register_forward_hook(self.flops_hook))
+                continue
+            label = name or type(module).__name__
+            self.handles.append(module.register_forward_pre_hook(partial(self.module_pre_hook, label)))
+            self.handles.append(module.register_forward_hook(partial(self.module_hook, label), always_call=True))
+
+            for method_name in self.methods:
+                method = getattr(module, method_name, None)
+                if callable(method):
+                    # Shadow the method of the class with an instance attribute, keeping any existing instance attribute to restore
+                    self.patched_methods.append((module, method_name, module.__dict__.get(method_name)))
+                    setattr(module, method_name, self.wrap_method(f"{name}.{method_name}" if name else method_name, method))
+        return self
+
+    def disable(self):
+        """
+        Remove the forward hooks and restore the profiled methods, so the model runs without profiling overhead.
+        """
+        for handle in self.handles:
+            handle.remove()
+        for module, method_name, original in reversed(self.patched_methods):
+            if original is None:
+                delattr(module, method_name)
+            else:
+                setattr(module, method_name, original)
+        self.handles, self.patched_methods = [], []
+
+    def get_stack(self):
+        """
+        Get the stack of open calls for the current thread, holding the start time and the FLOPs of the nested calls for each call.
+        """
+        if not hasattr(self.frames, 'stack'):
+            self.frames.stack = []
+        return self.frames.stack
+
+    def push_frame(self, label):
+        """
+        Start measuring a call.
+
+        Parameters:
+        label (str): The label of the module or method.
+        """
+        if label not in self.durations:
+            with self.lock:
+                # Register the label on its first call, so the statistics follow the call order
+                self.durations.setdefault(label, deque(maxlen=self.max_samples))
+        if self.synchronize:
+            torch.cuda.synchronize()
+        self.get_stack().append([time.perf_counter_ns(), 0])
+
+    def pop_frame(self, label, output, flops=0):
+        """
+        Finish measuring a call and record it.
+
+        Parameters:
+        label (str): The label of the module or method.
+        output (Any): The output of the call.
+        flops (int): The FLOPs of the call, excluding the nested calls.
+        """
+        if self.synchronize:
+            torch.cuda.synchronize()
+        end_time_ns = time.perf_counter_ns()
+        stack = self.get_stack()
+        start_time_ns, nested_flops = stack.pop()
+        flops += nested_flops
+        if stack:
+            # Add the FLOPs of the call to the enclosing call
+            stack[-1][1] += flops
+
+        activation_bytes = get_activation_bytes(output)
+        duration_ns = end_time_ns - start_time_ns
+        with self.lock:
+            self.durations[label].append(duration_ns / 1e6)
+            totals = self.totals.setdefault(label, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += flops
+            totals[2] += activation_bytes
+            self.events.append((label, start_time_ns, duration_ns, threading.get_ident(), flops, activation_bytes))
+
+    def module_pre_hook(self, label, module, args):
+        self.push_frame(label)
+
+    def module_hook(self, label, module, args, output):
+        self.pop_frame(label, output, count_module_flops(module, output))
+
+    def flops_hook(self, module, args, output):
+        stack = self.get_stack()
+        if stack:
+            stack[-1][1] += count_module_flops(module, output)
+
+    def wrap_method(self, label, method):
+        """
+        Wrap a bound method so that each call gets measured and recorded under a label.
+        """
+        @wraps(method)
+        def profiled_method(*args, **kwargs):
+            self.push_frame(label)
+            output = None
+            try:
+                output = method(*args, **kwargs)
+                return output
+            finally:
+                self.pop_frame(label, output)
+        return profiled_method
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the number of calls, the mean/p50/p99 time in milliseconds, and the mean FLOPs and activation bytes per call for each label, in call order.
+
+        The times cover the most recent `max_samples` calls of each label.
+        """
+        with self.lock:
+            stats = OrderedDict()
+            for label, durations in self.durations.items():
+                if label not in self.totals:
+                    continue
+                count, flops, activation_bytes = self.totals[label]
+                stats[label] = {
+                    'count': count,
+                    'mean_ms': float(np.mean(durations)),
+                    'p50_ms': float(np.percentile(durations, 50)),
+                    'p99_ms': float(np.percentile(durations, 99)),
+                    'flops': flops / count,
+                    'activation_bytes': activation_bytes / count,
+                }
+            return stats
+
+    def format_table(self,
+                     sort_by:Optional[str]=None, # The statistic to sort the rows by in descending order (e.g., 'mean_ms'). Defaults to the call order.
+                     max_rows:Optional[int]=None # The maximum number of rows.
+                    ) -> str: # The statistics as a plain-text table.
+        """
+        Format the statistics from `get_stats` as a plain-text table.
+        """
+        stats = list(self.get_stats().items())
+        if sort_by is not None:
+            stats.sort(key=lambda item: item[1][sort_by], reverse=True)
+        stats = stats[:max_rows]
+
+        name_width = max([len('name')] + [len(label) for label, _ in stats])
+        lines = [f"{'name':<{name_width}}  {'calls':>7}  {'mean ms':>9}  {'p50 ms':>9}  {'p99 ms':>9}  {'GFLOPs':>8}  {'act MiB':>9}"]
+        lines.append('-' * len(lines[0]))
+        for label, stat in stats:
+            lines.append(f"{label:<{name_width}}  {stat['count']:>7}  {stat['mean_ms']:>9.3f}  {stat['p50_ms']:>9.3f}  {stat['p99_ms']:>9.3f}  "
+                         f"{stat['flops'] / 1e9:>8.3f}  {stat['activation_bytes'] / 2**20:>9.3f}")
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self,
+                            path:Union[str, Path] # The file path for the trace.
+                           ) -> Path: # The path of the trace.
+        """
+        Write the recorded calls to a Chrome trace JSON file, which opens in `chrome://tracing` or Perfetto.
+
+        Each call becomes a complete event with its FLOPs and activation bytes as arguments, on a track for the thread that made it.
+        """
+        with self.lock:
+            trace_events = [{
+                'name': label, 'ph': 'X', 'pid': os.getpid(), 'tid': thread_id,
+                'ts': (start_time_ns - self.start_time_ns) / 1e3, 'dur': duration_ns / 1e3,
+                'args': {'flops': flops, 'activation_bytes': activation_bytes},
+            } for label, start_time_ns, duration_ns, thread_id, flops, activation_bytes in self.events]
+
+        path = Path(path)
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, trace_file)
+        return path
@@ -0,0 +1,243 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_quantization.ipynb.
+
+# %% auto 0
+__all__ = ['QuantizableSiLU', 'QuantizableFocus', 'QuantizableDarknetBottleneck', 'QuantizableCSPLayer',
+           'QuantizableSPPBottleneck', 'QuantizableYOLOXPAFPN', 'QuantizableYOLOX', 'QUANTIZABLE_MODULES',
+           'prepare_quantization', 'calibrate', 'convert_quantization', 'quantize_model']
+
+# %% ../nbs/06_quantization.ipynb 4
+import copy
+from typing import Any, Callable, Iterable, Optional
+
+# %% ../nbs/06_quantization.ipynb 5
+import torch
+import torch.nn as nn
+import torch.ao.quantization as tq
+from torch.ao.nn.quantized import FloatFunctional
+
+# %% ../nbs/06_quantization.ipynb 6
+from .model import ConvModule, DarknetBottleneck, CSPLayer, Focus, SPPBottleneck, YOLOXPAFPN, YOLOX
+
+# %% ../nbs/06_quantization.ipynb 9
+class QuantizableSiLU(nn.Module):
+    """
+    SiLU activation computed as `x * sigmoid(x)`, so it runs on quantized tensors.
+    """
+    def __init__(self):
+        super().__init__()
+        self.sigmoid = nn.Sigmoid()
+        self.mul = FloatFunctional()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.mul.mul(x, self.sigmoid(x))
+
+# %% ../nbs/06_quantization.ipynb 10
+class QuantizableFocus(Focus):
+    """
+    `Focus` with a quantizable concatenation of the patches.
+    """
+    def init_quantization(self):
+        assert self.folded_weight is None, "Call `unfold_normalization` before quantizing the model"
+        self.cat = FloatFunctional()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        # Concatenate the top left, top right, bottom left, and bottom right patches along the channel dimension
+        x = self.cat.cat((x[..., ::2, ::2], x[..., ::2, 1::2], x[..., 1::2, ::2], x[..., 1::2, 1::2]), dim=1)
+        return self.conv(x)
+
+# %% ../nbs/06_quantization.ipynb 11
+class QuantizableDarknetBottleneck(DarknetBottleneck):
+    """
+    `DarknetBottleneck` with a quantizable identity shortcut.
+    """
+    def init_quantization(self):
+        if self.add_identity:
+            self.add = FloatFunctional()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        out = self.conv2(self.conv1(x))
+        
+        # If add_identity is True, add the transformed (if necessary) identity to the output
+        if self.add_identity:
+            out = self.add.add(out, self.identity_conv(x))
+        return out
+
+# %% ../nbs/06_quantization.ipynb 12
+class QuantizableCSPLayer(CSPLayer):
+    """
+    `CSPLayer` with a quantizable concatenation of the main and shortcut paths.
+    """
+    def init_quantization(self):
+        self.cat = FloatFunctional()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        main_path = self.main_conv(x)
+        for block in self.blocks:
+            main_path = block(main_path)
+
+        shortcut_path = self.short_conv(x)
+
+        return self.final_conv(self.cat.cat((main_path, shortcut_path), dim=1))
+
+# %% ../nbs/06_quantization.ipynb 13
+class QuantizableSPPBottleneck(SPPBottleneck):
+    """
+    `SPPBottleneck` with a quantizable concatenation of the pooling results.
+    """
+    def init_quantization(self):
+        self.cat = FloatFunctional()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        x = self.conv1(x)
+
+        pooling_results = [x]
+        for pooling in self.pooling_layers:
+            pooling_results.append(pooling(x))
+
+        return self.conv2(self.cat.cat(pooling_results, dim=1))
+
+# %% ../nbs/06_quantization.ipynb 14
+class QuantizableYOLOXPAFPN(YOLOXPAFPN):
+    """
+    `YOLOXPAFPN` with quantizable concatenations in the top-down and bottom-up paths.
+    
+    Each concatenation gets its own `FloatFunctional`, so it gets its own quantization parameters.
+    """
+    def init_quantization(self):
+        self.top_down_cats = nn.ModuleList([FloatFunctional() for _ in self.top_down_blocks])
+        self.bottom_up_cats = nn.ModuleList([FloatFunctional() for _ in self.bottom_up_blocks])
+
+    def _top_down(self, inputs):
+        inner_outs = [inputs[-1]]
+        for idx, (reduce_layer, block, cat) in enumerate(zip(self.reduce_layers, self.top_down_blocks, self.top_down_cats)):
+            feat_high = reduce_layer(inner_outs[0])
+            inner_outs[0] = feat_high
+            upsample_feat = self.upsample(feat_high)
+            inner_out = block(cat.cat([upsample_feat, inputs[len(inputs) - 2 - idx]], 1))
+            inner_outs.insert(0, inner_out)
+        return inner_outs
+
+    def _bottom_up(self, inner_outs):
+        outs = [inner_outs[0]]
+        for idx, (downsample, block, cat) in enumerate(zip(self.downsamples, self.bottom_up_blocks, self.bottom_up_cats)):
+            downsample_feat = downsample(outs[-1])
+            out = block(cat.cat([downsample_feat, inner_outs[idx + 1]], 1))
+            outs.append(out)
+        return outs
+
+# %% ../nbs/06_quantization.ipynb 15
+class QuantizableYOLOX(YOLOX):
+    """
+    `YOLOX` with a quantization stub in front of the backbone and dequantization stubs after the head.
+    
+    The backbone, neck, and head run on quantized tensors, while the model still takes and returns float tensors, 
+    so `YOLOXInferenceWrapper` accepts the quantized model like the float one.
+    """
+    def init_quantization(self):
+        self.quant = tq.QuantStub()
+        self.dequant = tq.DeQuantStub()
+
+    def forward(self, x):
+        # Quantize the input
+        x = self.quant(x)
+        # Forward through backbone, neck, and bbox_head
+        x = self.bbox_head(self.neck(self.backbone(x)))
+        # Dequantize the class scores, bounding box predictions, and objectness scores for each scale level
+        return tuple([self.dequant(pred) for pred in level_preds] for level_preds in x)
+
+    def fold_normalization(self, *args, **kwargs):
+        raise TypeError("Quantized models take normalized inputs, so they cannot fold the normalization. "
+                        "Use `YOLOXInferenceWrapper` with `fold_normalization=False` to keep the normalization in the wrapper.")
+
+# %% ../nbs/06_quantization.ipynb 16
+QUANTIZABLE_MODULES = {
+    Focus: QuantizableFocus,
+    DarknetBottleneck: QuantizableDarknetBottleneck,
+    CSPLayer: QuantizableCSPLayer,
+    SPPBottleneck: QuantizableSPPBottleneck,
+    YOLOXPAFPN: QuantizableYOLOXPAFPN,
+    YOLOX: QuantizableYOLOX,
+}
+
+# %% ../nbs/06_quantization.ipynb 17
+def prepare_quantization(model:YOLOX, # The float YOLOX model (e.g., from `build_model`).
+                         backend:str='x86', # The quantized engine to use ('x86', 'fbgemm', 'onednn', or 'qnnpack' for ARM).
+                         qconfig:Optional[tq.QConfig]=None # The quantization config. Defaults to the default static config for the backend.
+                        ) -> QuantizableYOLOX: # A copy of the model with observers, ready for calibration.
+    """
+    Prepare a copy of a YOLOX model for post-training static INT8 quantization.
+
+    The copy has the batch normalization layers folded into the convolutions, quantizable SiLU activations, residual additions, and concatenations, 
+    and a quantization stub in front of the backbone. Run calibration data through it (see `calibrate`), then call `convert_quantization`.
+
+    This also sets the process-wide quantized engine (`torch.backends.quantized.engine`) to `backend`, 
+    since the conversion packs the INT8 weights for the current engine and the quantized model runs on it.
+    """
+    assert backend in torch.backends.quantized.supported_engines, f"Unsupported quantized engine: {backend}"
+    
+    # Work on an unfused float copy of the model in evaluation mode
+    model = copy.deepcopy(model).eval().unfuse()
+    model.unfold_normalization()
+    model.bbox_head.unfuse_predictors()
+    
+    for module in list(model.modules()):
+        if isinstance(module, ConvModule):
+            # Fold the batch normalization layer into the convolution and use a quantizable activation
+            tq.fuse_modules(module, [['conv', 'bn']], inplace=True)
+            if isinstance(module.activate, nn.SiLU):
+                module.activate = QuantizableSiLU()
+        if type(module) in QUANTIZABLE_MODULES:
+            # Swap in the quantizable version of the module, keeping its submodules and weights
+            module.__class__ = QUANTIZABLE_MODULES[type(module)]
+            module.init_quantization()
+    
+    torch.backends.quantized.engine = backend
+    model.qconfig = qconfig if qconfig is not None else tq.get_default_qconfig(backend)
+    model = tq.prepare(model)
+    
+    for module in model.modules():
+        if isinstance(module, QuantizableSiLU):
+            # The sigmoid outputs get fixed quantization parameters, so keep them in float during calibration 
+            # instead of fake-quantizing them and shifting the ranges the later observers record
+            module.sigmoid.apply(tq.disable_fake_quant)
+    return model
+
+# %% ../nbs/06_quantization.ipynb 19
+def calibrate(model:QuantizableYOLOX, # The model from `prepare_quantization`.
+              batches:Iterable[torch.Tensor], # The calibration batches (e.g., preprocessed images from the training set).
+              num_batches:Optional[int]=None, # The maximum number of batches to use. Defaults to all of them.
+              preprocess_fn:Optional[Callable[[torch.Tensor], torch.Tensor]]=None # A function to apply to each batch first (e.g., `YOLOXInferenceWrapper.preprocess_input`).
+             ) -> QuantizableYOLOX: # The calibrated model.
+    """
+    Run calibration batches through a prepared model, so its observers record the ranges of the activations.
+    """
+    with torch.no_grad():
+        for i, batch in enumerate(batches):
+            if num_batches is not None and i >= num_batches:
+                break
+            model(preprocess_fn(batch) if preprocess_fn is not None else batch)
+    return model
+
+# %% ../nbs/06_quantization.ipynb 20
+def convert_quantization(model:QuantizableYOLOX # The calibrated model from `calibrate`.
+                        ) -> QuantizableYOLOX: # The INT8 model.
+    """
+    Convert a calibrated model to INT8, replacing the observed modules with quantized ones.
+    """
+    return tq.convert(model.eval())
+
+# %% ../nbs/06_quantization.ipynb 21
+def quantize_model(model:YOLOX, # The float YOLOX model (e.g., from `build_model`).
+                   batches:Iterable[torch.Tensor], # The calibration batches.
+                   num_batches:Optional[int]=None, # The maximum number of calibration batches to use. Defaults to all of them.
+                   preprocess_fn:Optional[Callable[[torch.Tensor], torch.Tensor]]=None, # A function to apply to each calibration batch first.
+                   backend:str='x86' # The quantized engine to use.
+                  ) -> QuantizableYOLOX: # The INT8 model.
+    """
+    Prepare, calibrate, and convert a copy of a YOLOX model to INT8 in one step.
+    
+    Like `prepare_quantization`, this sets the process-wide quantized engine to `backend`.
+    """
+    model = prepare_quantization(model, backend)
+    calibrate(model, batches, num_batches, preprocess_fn)
+    return convert_quantization(model)
@@ -0,0 +1,414 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_serving.ipynb.
+
+# %% auto 0
+__all__ = ['InferenceRequest', 'DynamicBatcher', 'StreamingPipeline']
+
+# %% ../nbs/05_serving.ipynb 4
+import time
+import queue
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# %% ../nbs/05_serving.ipynb 5
+import torch
+
+# %% ../nbs/05_serving.ipynb 6
+from .inference import YOLOXInferenceWrapper
+
+# %% ../nbs/05_serving.ipynb 8
+@dataclass
+class InferenceRequest:
+    """
+    A pending request for the `DynamicBatcher`.
+    """
+    image: torch.Tensor # The input image, without a batch dimension.
+    future: Future = field(default_factory=Future) # The future that receives the output for the image.
+    enqueue_time: float = field(default_factory=time.perf_counter) # The time the request entered the queue.
+
+# %% ../nbs/05_serving.ipynb 9
+class DynamicBatcher:
+    """
+    An in-process dynamic batcher that serves a batched model, such as a `YOLOXInferenceWrapper`, to many concurrent callers.
+
+    Callers submit single images from any thread (`submit`) or event loop (`infer_async`). 
+    A worker thread groups the pending images by shape, data type, and device, runs one batched forward pass per group, 
+    and fans the outputs back to the callers through futures. 
+    A group runs as soon as it holds `max_batch_size` images, or once its oldest image has waited `max_wait_ms`.
+    """
+
+    def __init__(self, 
+                 model:Callable, # The batched model, such as a `YOLOXInferenceWrapper`.
+                 max_batch_size:int=8, # The maximum number of images in a batch.
+                 max_wait_ms:float=5.0, # The maximum time in milliseconds the oldest image in a group waits for the batch to fill.
+                 device:Optional[torch.device]=None, # The device to move each batch to. Defaults to the device of the submitted images.
+                 max_latency_samples:int=10000, # The number of recent request latencies to keep for the latency percentiles.
+                 start:bool=True # Whether to start the worker thread right away.
+                ):
+        """
+        Constructor for the DynamicBatcher class.
+        """
+        assert max_batch_size > 0, f"max_batch_size must be positive, but got {max_batch_size}"
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.device = device
+        # The pending requests for each image shape, data type, and device
+        self.pending_requests = OrderedDict()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.worker = None
+        # Metrics
+        self.num_requests = 0
+        self.batch_size_histogram = Counter()
+        self.latencies = deque(maxlen=max_latency_samples)
+        if start:
+            self.start()
+
+    def start(self):
+        """
+        Start the worker thread.
+        """
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.run_worker, name='DynamicBatcher', daemon=True)
+            self.worker.start()
+        return self
+
+    def submit(self, image:torch.Tensor # The input image, without a batch dimension.
+              ) -> Future: # A future that receives the model output for the image.
+        """
+        Add an image to the queue. This method is thread-safe.
+        """
+        request = InferenceRequest(image)
+        key = (tuple(image.shape), image.dtype, image.device)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Cannot submit requests to a closed DynamicBatcher.")
+            self.pending_requests.setdefault(key, deque()).append(request)
+            self.num_requests += 1
+            self.condition.notify()
+        return request.future
+
+    def infer(self, 
+              image:torch.Tensor, # The input image, without a batch dimension.
+              timeout:Optional[float]=None # The maximum time in seconds to wait for the output.
+             ) -> Any: # The model output for the image.
+        """
+        Submit an image and block until its output is ready.
+        """
+        return self.submit(image).result(timeout)
+
+    async def infer_async(self, image:torch.Tensor # The input image, without a batch dimension.
+                         ) -> Any: # The model output for the image.
+        """
+        Submit an image and await its output without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit(image))
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of images waiting for a batch.
+        """
+        with self.condition:
+            return sum(len(requests) for requests in self.pending_requests.values())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get the queue depth, the number of requests and batches, the batch size histogram, and the p50/p99 request latencies in milliseconds.
+
+        The latencies cover the time from `submit` until the output is ready, for the most recent `max_latency_samples` requests.
+        """
+        with self.condition:
+            latencies = np.array(self.latencies) * 1000
+            return {
+                'queue_depth': sum(len(requests) for requests in self.pending_requests.values()),
+                'num_requests': self.num_requests,
+                'num_batches': sum(self.batch_size_histogram.values()),
+                'batch_size_histogram': dict(sorted(self.batch_size_histogram.items())),
+                'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) > 0 else None,
+                'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) > 0 else None,
+            }
+
+    def next_batch(self):
+        """
+        Wait for the next batch of requests. Must be called with the condition held.
+
+        Returns:
+        list: The requests for the next batch, or None once the batcher is closed and the queue is empty.
+        """
+        while True:
+            if not self.pending_requests:
+                if self.closed:
+                    return None
+                self.condition.wait()
+                continue
+
+            # Prefer a full group, and otherwise take the group with the oldest request
+            key = next((key for key, requests in self.pending_requests.items() if len(requests) >= self.max_batch_size), None)
+            if key is None:
+                key = min(self.pending_requests, key=lambda key: self.pending_requests[key][0].enqueue_time)
+                wait_time = self.pending_requests[key][0].enqueue_time + self.max_wait - time.perf_counter()
+                if wait_time > 0 and not self.closed:
+                    self.condition.wait(wait_time)
+                    continue
+
+            # Take up to max_batch_size requests from the group
+            requests = self.pending_requests[key]
+            batch = [requests.popleft() for _ in range(min(self.max_batch_size, len(requests)))]
+            if not requests:
+                del self.pending_requests[key]
+            return batch
+
+    def run_batch(self, batch):
+        """
+        Run one batched forward pass and set the output (or the error) of each request.
+
+        Parameters:
+        batch (list): The requests in the batch.
+        """
+        # Skip requests that were cancelled while waiting
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            images = torch.stack([request.image for request in batch])
+            if self.device is not None:
+                images = images.to(self.device, non_blocking=True)
+            with torch.inference_mode():
+                outputs = self.model(images)
+
+            # Copy each output out of the batched output, which the model may reuse for the next batch (see `reuse_output_buffers`)
+            if isinstance(outputs, (tuple, list)):
+                results = [tuple(output[i].clone() for output in outputs) for i in range(len(batch))]
+            else:
+                results = [outputs[i].clone() for i in range(len(batch))]
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        # Record the metrics before the callers see the outputs
+        finish_time = time.perf_counter()
+        with self.condition:
+            self.batch_size_histogram[len(batch)] += 1
+            self.latencies.extend(finish_time - request.enqueue_time for request in batch)
+
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def run_worker(self):
+        """
+        Process batches until the batcher is closed and the queue is empty.
+        """
+        while True:
+            with self.condition:
+                batch = self.next_batch()
+            if batch is None:
+                return
+            try:
+                self.run_batch(batch)
+            except Exception as e:
+                # Fail the unfinished requests of this batch, and keep serving the next batches
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def close(self, wait:bool=True # Whether to wait for the pending requests to finish.
+             ):
+        """
+        Stop accepting requests. The worker thread processes the pending requests without waiting for the batches to fill, then exits.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if wait and self.worker is not None:
+            self.worker.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
+
+# %% ../nbs/05_serving.ipynb 21
+class StreamingPipeline:
+    """
+    A streaming inference pipeline for continuous video that overlaps the work on consecutive frames.
+
+    The pipeline takes an iterator of frames and yields the output for each frame in order. 
+    Separate worker threads read and preprocess the frames, run the model, and decode the boxes (and run NMS), 
+    passing batches of consecutive frames through bounded queues. 
+    A full queue blocks the stage before it, so a slow stage holds back the frame reader instead of buffering frames without limit.
+    """
+
+    STAGES = ('read', 'preprocess', 'forward', 'postprocess')
+
+    def __init__(self, 
+                 wrapper:YOLOXInferenceWrapper, # The inference wrapper. It must not reuse output buffers, since consecutive batches overlap.
+                 batch_size:int=1, # The number of consecutive frames to process together.
+                 max_queue_size:int=2, # The maximum number of batches waiting between two stages.
+                 letterbox_dims:Optional[Tuple[int, int]]=None, # The (height, width) to letterbox the frames to. Without it, all frames must have the same shape.
+                 device:Optional[torch.device]=None, # The device to move the batches to. Defaults to the device of the frames.
+                 max_timing_samples:int=1000 # The number of recent batches to keep for the stage timings.
+                ):
+        """
+        Constructor for the StreamingPipeline class.
+        """
+        assert not wrapper.reuse_output_buffers, "StreamingPipeline needs a wrapper with reuse_output_buffers=False"
+        self.wrapper = wrapper
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+        self.letterbox_dims = letterbox_dims
+        self.device = device
+        self.stage_times = {stage: deque(maxlen=max_timing_samples) for stage in self.STAGES}
+        self.num_frames = 0
+        self.elapsed_time = 0.0
+
+    def preprocess(self, frames):
+        """
+        Stack (or letterbox) a list of frames into a batch and preprocess it for the model.
+        """
+        if self.letterbox_dims is not None:
+            x, letterbox_params = self.wrapper.letterbox(frames, self.letterbox_dims)
+        else:
+            x, letterbox_params = torch.stack(frames), None
+        if self.device is not None:
+            x = x.to(self.device, non_blocking=True)
+            letterbox_params = letterbox_params.to(self.device) if letterbox_params is not None else None
+        input_dims = x.shape[self.wrapper.input_dim_slice]
+        return self.wrapper.preprocess_input(x), input_dims, letterbox_params
+
+    def forward(self, batch):
+        """
+        Pass a preprocessed batch through the model and postprocess the model output.
+        """
+        x, input_dims, letterbox_params = batch
+        return self.wrapper.process_output(self.wrapper.model(x)), input_dims, letterbox_params
+
+    def postprocess(self, batch):
+        """
+        Decode the bounding boxes (and detections) for a batch and split them into the outputs for each frame.
+        """
+        x, input_dims, letterbox_params = batch
+        if self.wrapper.run_box_and_prob_calculation:
+            x = self.wrapper.decode_output(x, input_dims, letterbox_params)
+        batch_size = (x[0] if isinstance(x, tuple) else x).shape[0]
+        return [tuple(output[i] for output in x) if isinstance(x, tuple) else x[i] for i in range(batch_size)]
+
+    def record_time(self, stage, start_time):
+        """
+        Record the time since `start_time` for a stage.
+        """
+        self.stage_times[stage].append(time.perf_counter() - start_time)
+
+    def get_stage_timings(self) -> Dict[str, float]:
+        """
+        Get the average time per batch for each stage in milliseconds, and the frames per second of the most recent stream.
+
+        The read time covers waiting on the frame iterator (e.g., decoding). 
+        Since the stages overlap, the frame rate is bound by the slowest stage rather than by the sum of the stage times.
+        """
+        timings = {f'{stage}_ms': float(np.mean(times)) * 1000 if len(times) > 0 else None for stage, times in self.stage_times.items()}
+        timings['fps'] = self.num_frames / self.elapsed_time if self.elapsed_time > 0 else None
+        return timings
+
+    def __call__(self, frames:Iterable[torch.Tensor] # The frames in the input layout of the wrapper, without a batch dimension.
+                ) -> Iterator[Any]: # The output for each frame, in order.
+        """
+        Run the pipeline over a stream of frames, yielding the output for each frame as soon as it is ready.
+        """
+        stop_event = threading.Event()
+        queues = [queue.Queue(maxsize=self.max_queue_size) for _ in range(3)]
+        end_of_stream = object()
+
+        def put(out_queue, item):
+            # Block while the queue is full, unless the pipeline is stopping
+            while not stop_event.is_set():
+                try:
+                    out_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(in_queue):
+            while not stop_event.is_set():
+                try:
+                    return in_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return end_of_stream
+
+        def read_frames():
+            try:
+                frame_iter = iter(frames)
+                with torch.inference_mode():
+                    while not stop_event.is_set():
+                        # Read the next batch of consecutive frames
+                        start_time = time.perf_counter()
+                        batch = [frame for _, frame in zip(range(self.batch_size), frame_iter)]
+                        if not batch:
+                            break
+                        self.record_time('read', start_time)
+                        
+                        start_time = time.perf_counter()
+                        batch = self.preprocess(batch)
+                        self.record_time('preprocess', start_time)
+                        if not put(queues[0], batch):
+                            return
+            except Exception as e:
+                put(queues[0], e)
+                return
+            put(queues[0], end_of_stream)
+
+        def run_stage(stage, stage_fn, in_queue, out_queue):
+            with torch.inference_mode():
+                while True:
+                    item = get(in_queue)
+                    # Pass the end of the stream and errors on to the next stage
+                    if item is end_of_stream or isinstance(item, Exception):
+                        put(out_queue, item)
+                        return
+                    start_time = time.perf_counter()
+                    try:
+                        item = stage_fn(item)
+                    except Exception as e:
+                        put(out_queue, e)
+                        return
+                    self.record_time(stage, start_time)
+                    if not put(out_queue, item):
+                        return
+
+        workers = [threading.Thread(target=read_frames, name='StreamingPipeline-read', daemon=True),
+                   threading.Thread(target=run_stage, args=('forward', self.forward, queues[0], queues[1]), 
+                                    name='StreamingPipeline-forward', daemon=True),
+                   threading.Thread(target=run_stage, args=('postprocess', self.postprocess, queues[1], queues[2]), 
+                                    name='StreamingPipeline-postprocess', daemon=True)]
+        
+        self.num_frames, self.elapsed_time = 0, 0.0
+        start_time = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        try:
+            while True:
+                outputs = get(queues[2])
+                if outputs is end_of_stream:
+                    return
+                if isinstance(outputs, Exception):
+                    raise outputs
+                for output in outputs:
+                    self.num_frames += 1
+                    self.elapsed_time = time.perf_counter() - start_time
+                    yield output
+        finally:
+            # Stop the workers, including when the caller stops iterating early
+            stop_event.set()
+            for worker in workers:
+                worker.join()
@@ -1,7 +1,7 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_simota.ipynb.
 
 # %% auto 0
-__all__ = ['AssignResult', 'SimOTAAssigner']
+__all__ = ['AssignResult', 'pad_ground_truths', 'batch_generalized_box_iou', 'SimOTAAssigner']
 
 # %% ../nbs/03_simota.ipynb 4
 from dataclasses import dataclass, field
@@ -12,6 +12,7 @@ from functools import partial
 import torch
 import torch.nn.functional as F
 import torchvision
+from torch.nn.utils.rnn import pad_sequence
 
 # %% ../nbs/03_simota.ipynb 7
 @dataclass
@@ -30,6 +31,53 @@ class AssignResult:
     category_labels: torch.LongTensor = field(default=None) # If specified, for each predicted bounding box, this indicates the category label of the assigned actual truth box.
 
 # %% ../nbs/03_simota.ipynb 8
+def pad_ground_truths(ground_truth_bboxes:List[torch.Tensor], # A list of ground truth bounding boxes for each image, each with shape [num_gts, 4].
+                      ground_truth_labels:List[torch.Tensor] # A list of ground truth labels for each image, each with shape [num_gts].
+                     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]: # (Padded boxes [B, max_num_gts, 4], padded labels [B, max_num_gts], validity mask [B, max_num_gts])
+    """
+    Pad per-image ground truth boxes and labels into batch tensors for `SimOTAAssigner.batch_assign`.
+
+    The real ground truths of each image come first, so their indices match the indices in the unpadded lists.
+    """
+    num_gts = torch.tensor([bboxes.size(0) for bboxes in ground_truth_bboxes], device=ground_truth_bboxes[0].device)
+    padded_bboxes = pad_sequence([bboxes.view(-1, 4) for bboxes in ground_truth_bboxes], batch_first=True)
+    padded_labels = pad_sequence(list(ground_truth_labels), batch_first=True)
+    gt_mask = torch.arange(padded_bboxes.size(1), device=num_gts.device)[None] < num_gts[:, None]
+    return padded_bboxes, padded_labels, gt_mask
+
+# %% ../nbs/03_simota.ipynb 10
+def batch_generalized_box_iou(boxes1:torch.Tensor, # Boxes in [tl_x, tl_y, br_x, br_y] format, shape [..., N, 4].
+                              boxes2:torch.Tensor # Boxes in [tl_x, tl_y, br_x, br_y] format, shape [..., M, 4].
+                             ) -> torch.Tensor: # The pairwise generalized IoU values, shape [..., N, M].
+    """
+    Batched version of `torchvision.ops.generalized_box_iou`.
+
+    It uses the same sequence of operations, so each [N, M] slice matches the unbatched result exactly.
+    """
+    upcast = lambda t: t if t.dtype in (torch.float32, torch.float64) else t.float()
+
+    area1 = upcast(boxes1)
+    area1 = (area1[..., 2] - area1[..., 0]) * (area1[..., 3] - area1[..., 1])
+    area2 = upcast(boxes2)
+    area2 = (area2[..., 2] - area2[..., 0]) * (area2[..., 3] - area2[..., 1])
+
+    # Intersection and union
+    lt = torch.max(boxes1[..., :, None, :2], boxes2[..., None, :, :2])
+    rb = torch.min(boxes1[..., :, None, 2:], boxes2[..., None, :, 2:])
+    wh = upcast(rb - lt).clamp(min=0)
+    inter = wh[..., 0] * wh[..., 1]
+    union = area1[..., None] + area2[..., None, :] - inter
+    iou = inter / union
+
+    # Smallest enclosing box
+    lti = torch.min(boxes1[..., :, None, :2], boxes2[..., None, :, :2])
+    rbi = torch.max(boxes1[..., :, None, 2:], boxes2[..., None, :, 2:])
+    whi = upcast(rbi - lti).clamp(min=0)
+    areai = whi[..., 0] * whi[..., 1]
+
+    return iou - (areai - union) / areai
+
+# %% ../nbs/03_simota.ipynb 11
 class SimOTAAssigner():
     """
     The `SimOTAAssigner` class assigns predicted bounding boxes to their corresponding ground truth boxes in object detection tasks. 
@@ -48,12 +96,18 @@ class SimOTAAssigner():
                  center_radius:float=2.5, # Ground truth center size to judge whether a output_grid_box is in center.
                  candidate_topk:int=10, # The candidate top-k which used to get top-k ious to calculate dynamic-k.
                  iou_weight:float=3.0, # The scale factor for regression iou cost.
-                 cls_weight:float=1.0 # The scale factor for classification cost.
+                 cls_weight:float=1.0, # The scale factor for classification cost.
+                 lean_cls_cost:bool=False, # Whether to compute the classification cost without building a [num_output_grid_boxes, num_gts, num_classes] tensor.
+                 sparse_candidates:bool=False, # Whether `assign` should only evaluate the (output_grid_box, ground truth) pairs that pass the box/center prior.
+                 range_candidates:bool=False # Whether to find the output_grid_boxes in each ground truth box and center from index ranges on the output grids instead of testing every output_grid_box.
                 ):
         self.center_radius = center_radius
         self.candidate_topk = candidate_topk
         self.iou_weight = iou_weight
         self.cls_weight = cls_weight
+        self.lean_cls_cost = lean_cls_cost
+        self.sparse_candidates = sparse_candidates
+        self.range_candidates = range_candidates
 
     def assign(self,
                pred_scores:torch.Tensor, # Classification scores of each output grid box across all classes.
@@ -89,13 +143,15 @@ class SimOTAAssigner():
                 assigned_labels = decoded_bboxes.new_full((num_bboxes, ), -1, dtype=torch.long)
             return AssignResult(num_gt, assigned_gt_inds, max_overlaps, category_labels=assigned_labels)
         
+        if self.sparse_candidates:
+            return self.sparse_assign(pred_scores, output_grid_boxes, decoded_bboxes, gt_bboxes, gt_labels, eps)
+        
         # Get info whether a output_grid_box is in gt bounding box and also the center of gt bounding box
         valid_mask, is_in_boxes_and_center = self.get_in_gt_and_in_center_info(output_grid_boxes, gt_bboxes)
         
         # Extract valid bounding boxes and scores (i.e., those in ground truth boxes and centers)
         valid_decoded_bbox = decoded_bboxes[valid_mask]
         valid_pred_scores = pred_scores[valid_mask]
-        num_valid = valid_decoded_bbox.size(0)
 
         # Compute IoU between valid decoded bounding boxes and gt bounding boxes
         pairwise_ious = torchvision.ops.generalized_box_iou(valid_decoded_bbox, gt_bboxes)
@@ -103,11 +159,8 @@ class SimOTAAssigner():
         # Compute IoU cost
         iou_cost = -torch.log(pairwise_ious + eps)
                 
-        # Convert gt_labels to one-hot format and calculate classification cost
-        gt_onehot_label = F.one_hot(gt_labels.to(torch.int64), pred_scores.shape[-1]).float().unsqueeze(0).repeat(num_valid, 1, 1)
-        valid_pred_scores = valid_pred_scores.unsqueeze(1).repeat(1, num_gt, 1)
-        
-        cls_cost = F.binary_cross_entropy_with_logits(valid_pred_scores, gt_onehot_label, reduction='none').sum(-1)
+        # Calculate classification cost
+        cls_cost = self.classification_cost(valid_pred_scores, gt_labels)
         
         # Calculate total cost matrix by combining classification and IoU costs, 
         # and assign a high cost (HIGH_COST_VALUE) for bboxes not in both boxes and centers
@@ -134,7 +187,21 @@ class SimOTAAssigner():
         This method determines which predicted boxes are inside a ground truth box and also at the center of the ground truth box. 
         It computes the centers of the ground truth boxes, checks if the predicted boxes are inside the ground truth boxes and centers, 
         and then returns a mask indicating which predicted boxes are in either any ground truth box or any center box and which are in both.
+        
+        With `range_candidates`, the masks are built from the candidate pairs of `get_grid_candidate_pairs` instead, 
+        as long as the output_grid_boxes form the row-major grids of `generate_output_grids`.
         """
+        grid_layout = self.get_grid_layout(output_grid_boxes) if self.range_candidates else None
+        if grid_layout is not None:
+            box_inds, gt_inds, is_in_boxes_and_center = self.get_grid_candidate_pairs(output_grid_boxes, gt_bboxes, grid_layout)
+
+            # The candidate pairs are sorted by output_grid_box, so each output_grid_box with a candidate gets one row
+            valid_inds, valid_rows = torch.unique_consecutive(box_inds, return_inverse=True)
+            is_in_gts_or_centers = torch.zeros(output_grid_boxes.size(0), dtype=torch.bool, device=output_grid_boxes.device)
+            is_in_gts_or_centers[valid_inds] = True
+            is_in_boxes_and_centers = is_in_gts_or_centers.new_zeros((valid_inds.size(0), gt_bboxes.size(0)))
+            is_in_boxes_and_centers[valid_rows, gt_inds] = is_in_boxes_and_center
+            return is_in_gts_or_centers, is_in_boxes_and_centers
 
         # Calculate the centers of the ground truth boxes
         gt_cxs = (gt_bboxes[:, 0] + gt_bboxes[:, 2]) / 2.0
@@ -180,38 +247,404 @@ class SimOTAAssigner():
                           ) -> Tuple[torch.Tensor, torch.Tensor]: # (IoU scores for matched pairs, The indices of the ground truth for each output_grid_box)
         """
         This method performs the dynamic k-matching process. 
-        For each ground truth box, it finds the top-k matching box predictions based on the smallest cost. 
+        For each ground truth box, it finds the top-k matching box predictions based on the smallest cost, with ties going to the lower index. 
         If a predicted box matches multiple ground truths, it keeps only the one with the smallest cost. 
         Finally, it returns the matched ground-truth indices and IoUs for valid predicted boxes.
+        
+        The matching runs through `batch_dynamic_k_matching`, so it has no loop over ground truths and does not synchronize with the device.
         """
 
-        # Initialize the matching matrix with zeros
-        matching_matrix = torch.zeros_like(cost)
+        # Match the ground truths as a batch of one image, where every output_grid_box and ground truth is valid
+        fg_mask_inboxes, matched_pred_ious, matched_gt_inds = self.batch_dynamic_k_matching(
+            cost[None], pairwise_ious[None], 
+            valid_mask.new_ones((1, cost.size(0))), valid_mask.new_ones((1, num_gt)))
+        fg_mask_inboxes, matched_pred_ious, matched_gt_inds = fg_mask_inboxes[0], matched_pred_ious[0], matched_gt_inds[0]
+
+        # Update the valid mask based on final matches
+        valid_mask.masked_scatter_(valid_mask.clone(), fg_mask_inboxes)
+
+        # Get the final matched ground truth indices and IoUs for valid predicted boxes
+        return matched_pred_ious[fg_mask_inboxes], matched_gt_inds[fg_mask_inboxes]
+
+    def classification_cost(self,
+                            pred_scores:torch.Tensor, # Classification scores of each output grid box across all classes, shape [..., num_output_grid_boxes, num_classes].
+                            gt_labels:torch.Tensor # Ground truth labels, shape [..., num_gts].
+                           ) -> torch.Tensor: # The classification cost of each output grid box and ground truth pair, shape [..., num_output_grid_boxes, num_gts].
+        """
+        Compute the summed binary cross entropy between each prediction and the one-hot label of each ground truth.
+        
+        With `lean_cls_cost`, this avoids building the [num_output_grid_boxes, num_gts, num_classes] tensor. 
+        Against a one-hot target, the sum over classes equals the per-prediction sum of the costs against an all-zero target, 
+        minus the score of the ground truth class. 
+        Otherwise, the scores and one-hot labels are expanded to the full tensor, which reproduces the original cost bit for bit.
+        """
+        if not self.lean_cls_cost:
+            # Convert gt_labels to one-hot format and expand scores and labels to every prediction and ground truth pair
+            gt_onehot_label = F.one_hot(gt_labels.long().clamp(min=0), pred_scores.shape[-1]).float().unsqueeze(-3)
+            pair_shape = (*pred_scores.shape[:-1], gt_labels.shape[-1], pred_scores.shape[-1])
+            return F.binary_cross_entropy_with_logits(pred_scores.unsqueeze(-2).expand(pair_shape), gt_onehot_label.expand(pair_shape), reduction='none').sum(-1)
+
+        # Cost of each prediction against an all-zero target
+        neg_cost = F.binary_cross_entropy_with_logits(pred_scores, torch.zeros_like(pred_scores), reduction='none').sum(-1, keepdim=True)
+        
+        # Gather the score of each ground truth class for every prediction
+        gt_index = gt_labels.long().clamp(min=0).unsqueeze(-2).expand(*pred_scores.shape[:-1], gt_labels.shape[-1])
+        return neg_cost - pred_scores.gather(-1, gt_index)
+
+    def batch_assign(self,
+                     pred_scores:torch.Tensor, # Classification scores of each output grid box across all classes, shape [B, num_output_grid_boxes, num_classes].
+                     output_grid_boxes:torch.Tensor, # Output grid bounding boxes in format [cx, xy, stride_w, stride_y], shape [num_output_grid_boxes, 4] or [B, num_output_grid_boxes, 4].
+                     decoded_bboxes:torch.Tensor, # Predicted bounding boxes in format [tl_x, tl_y, br_x, br_y], shape [B, num_output_grid_boxes, 4].
+                     gt_bboxes:torch.Tensor, # Padded ground truth bounding boxes in format [tl_x, tl_y, br_x, br_y], shape [B, max_num_gts, 4].
+                     gt_labels:torch.Tensor, # Padded ground truth labels, shape [B, max_num_gts].
+                     gt_mask:torch.Tensor, # Marks the real (non-padding) ground truth boxes, shape [B, max_num_gts].
+                     eps:float=1e-7 # A value added to the denominator for numerical stability.
+                    ) -> List[AssignResult]: # The assignment result for each image.
+        """Assign ground truth to output_grid_boxes for a whole batch using SimOTA.
+
+        This method follows the same steps as `assign`, but runs them for every image at once on padded ground truth tensors (see `pad_ground_truths`). 
+        The classification cost comes from `classification_cost` (which only stays small with `lean_cls_cost`), and the matching from `batch_dynamic_k_matching`. 
+        Ground truth indices in the results refer to positions along the padded ground truth dimension.
+        """
+        HIGH_COST_VALUE = 100000000
+        batch_size, num_bboxes = decoded_bboxes.shape[:2]
+        num_gts = gt_mask.sum(dim=1).tolist()
 
-        # Select the top k IoUs for dynamic-k calculation
-        topk_ious, _ = torch.topk(pairwise_ious, self.candidate_topk, dim=0)
+        if gt_bboxes.size(1) == 0 or num_bboxes == 0:
+            # No ground truth or boxes, return empty assignments
+            return [AssignResult(num_gt, 
+                                 decoded_bboxes.new_zeros((num_bboxes, ), dtype=torch.long), 
+                                 decoded_bboxes.new_zeros((num_bboxes, )), 
+                                 category_labels=decoded_bboxes.new_full((num_bboxes, ), -1, dtype=torch.long)) 
+                    for num_gt in num_gts]
+
+        if output_grid_boxes.dim() == 2:
+            output_grid_boxes = output_grid_boxes.expand(batch_size, -1, -1)
+
+        # Get info whether a output_grid_box is in gt bounding box and also the center of gt bounding box
+        valid_mask, is_in_boxes_and_center = self.batch_get_in_gt_and_in_center_info(output_grid_boxes, gt_bboxes, gt_mask)
+
+        # Compute IoU and IoU cost between all decoded bounding boxes and gt bounding boxes
+        pairwise_ious = batch_generalized_box_iou(decoded_bboxes, gt_bboxes)
+        iou_cost = -torch.log(pairwise_ious + eps)
+
+        # Calculate classification cost
+        cls_cost = self.classification_cost(pred_scores, gt_labels)
+
+        # Calculate total cost matrix by combining classification and IoU costs, 
+        # and assign a high cost (HIGH_COST_VALUE) for bboxes not in both boxes and centers
+        cost_matrix = cls_cost * self.cls_weight + iou_cost * self.iou_weight
+        cost_matrix = torch.where(is_in_boxes_and_center, cost_matrix, cost_matrix + HIGH_COST_VALUE)
+
+        # Perform matching between ground truth and valid bounding boxes based on the cost matrix
+        fg_mask, matched_pred_ious, matched_gt_inds = self.batch_dynamic_k_matching(cost_matrix, pairwise_ious, valid_mask, gt_mask)
+
+        # Convert to AssignResult format: assign matched gt indices, labels and IoU scores
+        assigned_gt_inds = torch.where(fg_mask, matched_gt_inds + 1, 0)
+        assigned_labels = torch.where(fg_mask, gt_labels.long().gather(1, matched_gt_inds), -1)
+        # Images without ground truth get zero overlaps, like in `assign` (selected with tensors rather than a branch on the number of ground truths)
+        unmatched_overlaps = torch.where(gt_mask.any(dim=1, keepdim=True), -HIGH_COST_VALUE, 0.0)
+        max_overlaps = torch.where(fg_mask, matched_pred_ious.float(), unmatched_overlaps)
+
+        return [AssignResult(num_gt, assigned_gt_inds[i], max_overlaps[i], category_labels=assigned_labels[i]) 
+                for i, num_gt in enumerate(num_gts)]
+
+    def batch_get_in_gt_and_in_center_info(self, 
+                                           output_grid_boxes:torch.Tensor, # Output grid boxes in [cx, xy, stride_w, stride_y] format, shape [B, num_output_grid_boxes, 4].
+                                           gt_bboxes:torch.Tensor, # Padded ground truth bboxes in [tl_x, tl_y, br_x, br_y] format, shape [B, max_num_gts, 4].
+                                           gt_mask:torch.Tensor # Marks the real (non-padding) ground truth boxes, shape [B, max_num_gts].
+                                          ) -> Tuple[torch.Tensor, torch.Tensor]: # [B, num_output_grid_boxes] mask of output_grid_boxes in any ground truth box or center, and [B, num_output_grid_boxes, max_num_gts] mask of pairs in both.
+        """Batched version of `get_in_gt_and_in_center_info`.
+        
+        The pair masks come from `get_in_gt_and_in_center_masks`, 
+        and the returned pair mask covers every output_grid_box rather than only those in a box or center.
+        """
+        # Check if output_grid_boxes are inside the ground truth boxes and center boxes
+        is_in_gts, is_in_cts = self.get_in_gt_and_in_center_masks(output_grid_boxes, gt_bboxes)
+        is_in_gts &= gt_mask[:, None, :]
+        is_in_cts &= gt_mask[:, None, :]
+
+        # Check if output_grid_boxes are in either any ground truth box or any center box
+        is_in_gts_or_centers = is_in_gts.any(dim=2) | is_in_cts.any(dim=2)
+
+        # Check if output_grid_boxes are in both ground truth boxes and centers
+        is_in_boxes_and_centers = is_in_gts & is_in_cts
+
+        return is_in_gts_or_centers, is_in_boxes_and_centers
+
+    def get_in_gt_and_in_center_masks(self, 
+                                      output_grid_boxes:torch.Tensor, # Output grid boxes in [cx, xy, stride_w, stride_y] format, shape [..., num_output_grid_boxes, 4].
+                                      gt_bboxes:torch.Tensor # Ground truth bboxes in [tl_x, tl_y, br_x, br_y] format, shape [..., num_gts, 4].
+                                     ) -> Tuple[torch.Tensor, torch.Tensor]: # Masks of the (output_grid_box, ground truth) pairs in the ground truth box, and in the center box, each with shape [..., num_output_grid_boxes, num_gts].
+        """
+        Check which output_grid_boxes are inside each ground truth box and each ground truth center box. 
+        
+        The four boundary checks are combined with logical ands instead of stacking the bounds and taking their minimum.
+        """
+        grid_xs, grid_ys = output_grid_boxes[..., 0, None], output_grid_boxes[..., 1, None]
+        stride_xs, stride_ys = output_grid_boxes[..., 2, None], output_grid_boxes[..., 3, None]
+        gt_x0s, gt_y0s, gt_x1s, gt_y1s = [coords[..., None, :] for coords in gt_bboxes.unbind(-1)]
+
+        # Calculate the centers of the ground truth boxes
+        gt_cxs = (gt_x0s + gt_x1s) / 2.0
+        gt_cys = (gt_y0s + gt_y1s) / 2.0
+
+        # Check if output_grid_boxes are inside the ground truth boxes
+        is_in_gts = ((grid_xs - gt_x0s > 0) & (grid_ys - gt_y0s > 0) & (gt_x1s - grid_xs > 0) & (gt_y1s - grid_ys > 0))
+
+        # Check if output_grid_boxes are inside the center boxes
+        is_in_cts = ((grid_xs - (gt_cxs - self.center_radius * stride_xs) > 0) 
+                     & (grid_ys - (gt_cys - self.center_radius * stride_ys) > 0) 
+                     & ((gt_cxs + self.center_radius * stride_xs) - grid_xs > 0) 
+                     & ((gt_cys + self.center_radius * stride_ys) - grid_ys > 0))
+
+        return is_in_gts, is_in_cts
+
+    def batch_dynamic_k_matching(self, 
+                                 cost:torch.Tensor, # The cost matrix for the batch, shape [B, num_output_grid_boxes, max_num_gts].
+                                 pairwise_ious:torch.Tensor, # IoU scores between predictions and ground truths, shape [B, num_output_grid_boxes, max_num_gts].
+                                 valid_mask:torch.Tensor, # Marks output_grid_boxes in any ground truth box or center, shape [B, num_output_grid_boxes].
+                                 gt_mask:torch.Tensor # Marks the real (non-padding) ground truth boxes, shape [B, max_num_gts].
+                                ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]: # (Foreground mask, IoU scores for matched pairs, The indices of the ground truth for each output_grid_box), each with shape [B, num_output_grid_boxes]
+        """
+        Batched version of `dynamic_k_matching`. 
+        
+        Only valid output_grid_boxes and real ground truths take part in the matching. 
+        Each ground truth keeps the valid output_grid_boxes whose cost is below its k-th smallest cost, 
+        so there is no loop over ground truths and no device synchronization.
+        """
+        num_bboxes = cost.size(1)
+        candidate_topk = min(self.candidate_topk, num_bboxes)
+        pair_mask = valid_mask[..., None] & gt_mask[:, None, :]
+
+        # Select the top k IoUs of the valid output_grid_boxes for dynamic-k calculation
+        topk_ious, _ = torch.topk(pairwise_ious.masked_fill(~valid_mask[..., None], -float('inf')), candidate_topk, dim=1)
+        topk_ious = topk_ious.masked_fill(topk_ious == -float('inf'), 0)
 
         # Calculate dynamic k for each ground truth
-        dynamic_ks = topk_ious.sum(0).int().clamp(min=1)
+        dynamic_ks = topk_ious.sum(1).int().clamp(min=1)
+
+        # Order costs like a sort does (finite, then infinite, then NaN). Invalid output_grid_boxes get NaN, which is never selected.
+        rank_cost = cost.nan_to_num(nan=float('inf'), posinf=torch.finfo(cost.dtype).max, neginf=-float('inf'))
+        rank_cost = rank_cost.masked_fill(~valid_mask[..., None], float('nan'))
 
-        # For each ground truth, find top k matching output_grid_boxes based on smallest cost
-        _, pos_idx = cost.topk(k=dynamic_ks.max().item(), dim=0, largest=False)
-        for gt_idx in range(num_gt):
-            matching_matrix[pos_idx[:dynamic_ks[gt_idx], gt_idx], gt_idx] = 1
+        # For each ground truth, select the dynamic k output_grid_boxes with the smallest cost. 
+        # Costs tied with the k-th smallest cost go to the lower indices, like the stable sort in `dynamic_k_matching`.
+        topk_costs, _ = rank_cost.topk(k=candidate_topk, dim=1, largest=False)
+        kth_cost = topk_costs.gather(1, (dynamic_ks[:, None, :] - 1).long())
+        is_below = rank_cost < kth_cost
+        is_tied = rank_cost == kth_cost
+        num_tied_selected = dynamic_ks[:, None, :] - is_below.sum(1, keepdim=True, dtype=torch.int32)
+        matching_matrix = (is_below | (is_tied & (is_tied.cumsum(1, dtype=torch.int32) <= num_tied_selected))).to(cost.dtype)
+        matching_matrix.masked_fill_(~pair_mask, 0)
 
         # If a output_grid_box matches multiple ground truths, keep only the one with smallest cost
-        output_grid_box_match_gt_mask = matching_matrix.sum(1) > 1
-        if output_grid_box_match_gt_mask.any():
-            _, cost_argmin = cost[output_grid_box_match_gt_mask].min(dim=1)
-            matching_matrix[output_grid_box_match_gt_mask].zero_()
-            matching_matrix[output_grid_box_match_gt_mask, cost_argmin] = 1
+        output_grid_box_match_gt_mask = matching_matrix.sum(2, keepdim=True) > 1
+        _, cost_argmin = cost.masked_fill(~gt_mask[:, None, :], float('inf')).min(dim=2, keepdim=True)
+        matching_matrix.masked_fill_(output_grid_box_match_gt_mask, 0)
+        matching_matrix.scatter_reduce_(2, cost_argmin, output_grid_box_match_gt_mask.to(cost.dtype), reduce='amax')
 
-        # Update the valid mask based on final matches
-        valid_mask[valid_mask.clone()] = matching_matrix.sum(1) > 0
+        # Get the final matched ground truth indices and IoUs for each output_grid_box
+        fg_mask = matching_matrix.sum(2) > 0
+        matched_gt_inds = matching_matrix.argmax(2)
+        matched_pred_ious = (matching_matrix * pairwise_ious.masked_fill(~pair_mask, 0)).sum(2)
 
-        # Get the final matched ground truth indices and IoUs for valid predicted boxes
-        fg_mask_inboxes = matching_matrix.sum(1) > 0
-        matched_gt_inds = matching_matrix[fg_mask_inboxes].argmax(1)
-        matched_pred_ious = (matching_matrix * pairwise_ious).sum(1)[fg_mask_inboxes]
+        return fg_mask, matched_pred_ious, matched_gt_inds
+
+    def sparse_assign(self,
+                      pred_scores:torch.Tensor, # Classification scores of each output grid box across all classes.
+                      output_grid_boxes:torch.Tensor, # Output grid bounding boxes of one image in format [cx, xy, stride_w, stride_y].
+                      decoded_bboxes:torch.Tensor, # Predicted bounding boxes of one image in format [tl_x, tl_y, br_x, br_y].
+                      gt_bboxes:torch.Tensor, # Ground truth bounding boxes of one image in format [tl_x, tl_y, br_x, br_y].
+                      gt_labels:torch.Tensor, # Ground truth labels of one image, It is a Tensor with shape [num_gts].
+                      eps:float=1e-7 # A value added to the denominator for numerical stability.
+                     ) -> AssignResult:
+        """Sparse version of `assign`, used when `sparse_candidates` is set.
+        
+        Only the (output_grid_box, ground truth) pairs where the output_grid_box is in the ground truth box or its center are candidates. 
+        Their IoUs and costs are stored as a list of pairs (COO format) instead of [num_valid, num_gts] matrices, 
+        and the matching runs on that list (see `sparse_dynamic_k_matching`). 
+        The result only differs from `assign` when a ground truth has fewer candidates than its dynamic k, 
+        since `assign` can then match it to output_grid_boxes that are only in the box or center of other ground truths.
+        """
+        HIGH_COST_VALUE = 100000000
+        num_gt = gt_bboxes.size(0)
+        num_bboxes = decoded_bboxes.size(0)
+
+        # Get the candidate pairs, and whether each one is in both the ground truth box and center
+        box_inds, gt_inds, is_in_boxes_and_center = self.get_candidate_pairs(output_grid_boxes, gt_bboxes)
+
+        # Compute IoU and IoU cost for the candidate pairs
+        pair_ious = batch_generalized_box_iou(decoded_bboxes[box_inds, None], gt_bboxes[gt_inds, None])[:, 0, 0]
+        iou_cost = -torch.log(pair_ious + eps)
+
+        # Calculate the classification cost for the candidate pairs (see `classification_cost`)
+        neg_cost = F.binary_cross_entropy_with_logits(pred_scores, torch.zeros_like(pred_scores), reduction='none').sum(-1)
+        cls_cost = neg_cost[box_inds] - pred_scores[box_inds, gt_labels[gt_inds].long()]
+
+        # Calculate the total cost of each candidate pair, 
+        # and assign a high cost (HIGH_COST_VALUE) for pairs not in both the box and center
+        cost = cls_cost * self.cls_weight + iou_cost * self.iou_weight + (~is_in_boxes_and_center) * HIGH_COST_VALUE
+
+        # Perform matching between ground truth and output_grid_boxes based on the candidate costs
+        fg_mask, matched_pred_ious, matched_gt_inds = self.sparse_dynamic_k_matching(cost, pair_ious, box_inds, gt_inds, num_bboxes, num_gt)
+
+        # Convert to AssignResult format: assign matched gt indices, labels and IoU scores
+        assigned_gt_inds = torch.where(fg_mask, matched_gt_inds + 1, 0)
+        assigned_labels = torch.where(fg_mask, gt_labels.long()[matched_gt_inds], -1)
+        max_overlaps = torch.where(fg_mask, matched_pred_ious.float(), -HIGH_COST_VALUE)
+
+        return AssignResult(num_gt, assigned_gt_inds, max_overlaps, category_labels=assigned_labels)
+
+    def get_candidate_pairs(self, 
+                            output_grid_boxes:torch.Tensor, # All output_grid_boxes of one image, shape [num_output_grid_boxes, 4] in [cx, xy, stride_w, stride_y] format.
+                            gt_bboxes:torch.Tensor # Ground truth bboxes of one image, shape [num_gts, 4] in [tl_x, tl_y, br_x, br_y] format.
+                           ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]: # (output_grid_box index, ground truth index, whether the pair is in both the box and center) for each candidate pair.
+        """
+        Get the (output_grid_box, ground truth) pairs where the output_grid_box is in the ground truth box or its center box. 
+        
+        The pairs are sorted by output_grid_box index, then ground truth index. 
+        With `range_candidates`, they come from `get_grid_candidate_pairs` when the output grid layout is known.
+        """
+        grid_layout = self.get_grid_layout(output_grid_boxes) if self.range_candidates else None
+        if grid_layout is not None:
+            return self.get_grid_candidate_pairs(output_grid_boxes, gt_bboxes, grid_layout)
+
+        is_in_gts, is_in_cts = self.get_in_gt_and_in_center_masks(output_grid_boxes, gt_bboxes)
+        box_inds, gt_inds = torch.nonzero(is_in_gts | is_in_cts, as_tuple=True)
+        return box_inds, gt_inds, is_in_gts[box_inds, gt_inds] & is_in_cts[box_inds, gt_inds]
+
+    def get_grid_layout(self, 
+                        output_grid_boxes:torch.Tensor # All output_grid_boxes of one image, shape [num_output_grid_boxes, 4] in [cx, xy, stride_w, stride_y] format.
+                       ) -> Optional[List[Tuple[int, int, int]]]: # (index of the first output_grid_box, grid height, grid width) for each stride, or None if the output_grid_boxes do not form whole grids.
+        """
+        Recover the output grid of each stride from the output_grid_boxes.
+        
+        The output_grid_boxes must list one row-major grid per stride, like `generate_output_grids`. 
+        Each grid spans from its first to its last output_grid_box, so this only reads those two rows per stride.
+        """
+        if output_grid_boxes.size(0) == 0:
+            return None
+        
+        # Split the output_grid_boxes into runs with the same stride
+        is_first = torch.ones_like(output_grid_boxes[:, 0], dtype=torch.bool)
+        is_first[1:] = (output_grid_boxes[1:, 2:] != output_grid_boxes[:-1, 2:]).any(dim=1)
+        starts = is_first.nonzero()[:, 0]
+        ends = torch.cat([starts[1:], starts.new_tensor([output_grid_boxes.size(0)])])
+        counts = ends - starts
+        corners = torch.stack([output_grid_boxes[starts], output_grid_boxes[ends - 1]], dim=1).tolist()
+
+        grid_layout = []
+        for start, count, ((x0, y0, stride_w, stride_h), (x1, y1, _, _)) in zip(starts.tolist(), counts.tolist(), corners):
+            grid_width = round((x1 - x0) / stride_w) + 1
+            grid_height = round((y1 - y0) / stride_h) + 1
+            if grid_width * grid_height != count:
+                return None
+            grid_layout.append((start, grid_height, grid_width))
+        return grid_layout
+
+    def get_grid_candidate_pairs(self, 
+                                 output_grid_boxes:torch.Tensor, # All output_grid_boxes of one image, shape [num_output_grid_boxes, 4] in [cx, xy, stride_w, stride_y] format.
+                                 gt_bboxes:torch.Tensor, # Ground truth bboxes of one image, shape [num_gts, 4] in [tl_x, tl_y, br_x, br_y] format.
+                                 grid_layout:List[Tuple[int, int, int]] # The output grid of each stride, from `get_grid_layout`.
+                                ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]: # (output_grid_box index, ground truth index, whether the pair is in both the box and center) for each candidate pair.
+        """
+        Index-range version of `get_candidate_pairs`. 
+        
+        On each grid, the output_grid_boxes in a ground truth box or its center box lie in one range of rows and columns, 
+        which follows from the ground truth coordinates and the stride. 
+        Only the output_grid_boxes in these ranges are tested, so the work grows with the number of covered output_grid_boxes rather than num_output_grid_boxes x num_gts. 
+        The ranges include one extra output_grid_box on each side, and the covered output_grid_boxes are checked with `get_in_gt_and_in_center_masks`, 
+        so the pairs match `get_candidate_pairs` exactly.
+        """
+        device = output_grid_boxes.device
+        num_gt = gt_bboxes.size(0)
+        starts, grid_heights, grid_widths = torch.tensor(grid_layout, device=device).view(-1, 3).unbind(1)
+
+        # Position and stride of the first output_grid_box of each grid, shape [num_grids, 1]
+        origin_xs, origin_ys, stride_ws, stride_hs = [coords[:, None] for coords in output_grid_boxes[starts].unbind(-1)]
+
+        # Calculate the extent covering each ground truth box and its center box on each grid, shape [num_grids, num_gts]
+        gt_cxs = (gt_bboxes[:, 0] + gt_bboxes[:, 2]) / 2.0
+        gt_cys = (gt_bboxes[:, 1] + gt_bboxes[:, 3]) / 2.0
+        min_xs = torch.minimum(gt_bboxes[:, 0], gt_cxs - self.center_radius * stride_ws)
+        min_ys = torch.minimum(gt_bboxes[:, 1], gt_cys - self.center_radius * stride_hs)
+        max_xs = torch.maximum(gt_bboxes[:, 2], gt_cxs + self.center_radius * stride_ws)
+        max_ys = torch.maximum(gt_bboxes[:, 3], gt_cys + self.center_radius * stride_hs)
+
+        # Convert the extent to column and row ranges, clipped to each grid
+        first_cols = ((min_xs - origin_xs) / stride_ws).floor().clamp(min=0)
+        first_rows = ((min_ys - origin_ys) / stride_hs).floor().clamp(min=0)
+        last_cols = torch.minimum(((max_xs - origin_xs) / stride_ws).ceil(), grid_widths[:, None] - 1)
+        last_rows = torch.minimum(((max_ys - origin_ys) / stride_hs).ceil(), grid_heights[:, None] - 1)
+        num_cols = (last_cols - first_cols + 1).clamp(min=0).long().flatten()
+        num_rows = (last_rows - first_rows + 1).clamp(min=0).long().flatten()
+
+        # Enumerate the output_grid_boxes in the range of each (grid, ground truth) pair
+        num_cells = num_cols * num_rows
+        range_inds = torch.repeat_interleave(torch.arange(num_cells.size(0), device=device), num_cells)
+        cell_inds = torch.arange(range_inds.size(0), device=device) - (num_cells.cumsum(0) - num_cells)[range_inds]
+        rows = first_rows.long().flatten()[range_inds] + cell_inds // num_cols[range_inds]
+        cols = first_cols.long().flatten()[range_inds] + cell_inds % num_cols[range_inds]
+        grid_inds = range_inds // num_gt
+        gt_inds = range_inds % num_gt
+        box_inds = starts[grid_inds] + rows * grid_widths[grid_inds] + cols
+
+        # Check the covered output_grid_boxes, and keep those in the ground truth box or center box
+        is_in_gts, is_in_cts = self.get_in_gt_and_in_center_masks(output_grid_boxes[box_inds, None], gt_bboxes[gt_inds, None])
+        is_in_gts, is_in_cts = is_in_gts[:, 0, 0], is_in_cts[:, 0, 0]
+        keep = is_in_gts | is_in_cts
+        box_inds, gt_inds, is_in_boxes_and_center = box_inds[keep], gt_inds[keep], is_in_gts[keep] & is_in_cts[keep]
+
+        # Sort the pairs by output_grid_box index, then ground truth index
+        order = torch.argsort(box_inds * num_gt + gt_inds)
+        return box_inds[order], gt_inds[order], is_in_boxes_and_center[order]
+
+    def sparse_dynamic_k_matching(self, 
+                                  cost:torch.Tensor, # The cost of each candidate pair, shape [num_pairs].
+                                  pair_ious:torch.Tensor, # The IoU of each candidate pair, shape [num_pairs].
+                                  box_inds:torch.Tensor, # The output_grid_box index of each candidate pair, sorted, shape [num_pairs].
+                                  gt_inds:torch.Tensor, # The ground truth index of each candidate pair, shape [num_pairs].
+                                  num_bboxes:int, # The number of output_grid_boxes.
+                                  num_gt:int # The number of ground truth boxes.
+                                 ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]: # (Foreground mask, IoU scores for matched pairs, The indices of the ground truth for each output_grid_box), each with shape [num_bboxes]
+        """
+        Sparse version of `dynamic_k_matching` that works on a list of candidate pairs. 
+        
+        Each ground truth gets a dynamic k from the sum of its top candidate IoUs, and keeps its k candidates with the smallest cost, with ties going to the lower index. 
+        If a output_grid_box matches multiple ground truths, it keeps only the candidate with the smallest cost.
+        """
+        device = cost.device
+        num_pairs = cost.size(0)
+        pair_ranks = torch.arange(num_pairs, device=device)
+        group_sizes = torch.bincount(gt_inds, minlength=num_gt)
+        group_starts = group_sizes.cumsum(0) - group_sizes
+
+        def rank_in_group(order):
+            # Stable sort the pairs by ground truth, keeping the given order within each ground truth
+            order = order[torch.argsort(gt_inds[order], stable=True)]
+            return order, pair_ranks - group_starts[gt_inds[order]]
+
+        # Calculate dynamic k for each ground truth from its top k candidate IoUs
+        order, ranks = rank_in_group(torch.argsort(-pair_ious, stable=True))
+        topk_ious = torch.where(ranks < self.candidate_topk, pair_ious[order], 0)
+        dynamic_ks = pair_ious.new_zeros(num_gt).index_add_(0, gt_inds[order], topk_ious).int().clamp(min=1)
+
+        # For each ground truth, select the dynamic k candidates with the smallest cost
+        order, ranks = rank_in_group(torch.argsort(cost, stable=True))
+        is_selected = torch.empty_like(cost, dtype=torch.bool)
+        is_selected[order] = ranks < dynamic_ks[gt_inds[order]]
+
+        # If a output_grid_box matches multiple ground truths, keep only the candidate with smallest cost (the lowest ground truth index on ties)
+        num_matches = torch.zeros(num_bboxes, dtype=torch.long, device=device).index_add_(0, box_inds, is_selected.long())
+        min_costs = cost.new_full((num_bboxes,), float('inf')).scatter_reduce_(0, box_inds, cost, reduce='amin')
+        is_min_cost = cost == min_costs[box_inds]
+        cost_argmin = gt_inds.new_full((num_bboxes,), num_gt).scatter_reduce_(0, box_inds[is_min_cost], gt_inds[is_min_cost], reduce='amin')
+        is_selected = torch.where(num_matches[box_inds] > 1, gt_inds == cost_argmin[box_inds], is_selected)
+
+        # Get the matched ground truth indices and IoUs for each output_grid_box
+        fg_mask = num_matches > 0
+        matched_gt_inds = gt_inds.new_zeros(num_bboxes).index_put_((box_inds[is_selected],), gt_inds[is_selected])
+        matched_pred_ious = pair_ious.new_zeros(num_bboxes).index_put_((box_inds[is_selected],), pair_ious[is_selected])
 
-        return matched_pred_ious, matched_gt_inds
+        return fg_mask, matched_pred_ious, matched_gt_inds
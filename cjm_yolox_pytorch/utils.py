@@ -1,7 +1,7 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/01_utils.ipynb.
 
 # %% auto 0
-__all__ = ['multi_apply', 'generate_output_grids']
+__all__ = ['multi_apply', 'generate_output_grids', 'is_channels_last']
 
 # %% ../nbs/01_utils.ipynb 4
 from pathlib import Path
@@ -19,20 +19,17 @@ def multi_apply(func:Callable[..., Any], # Function to apply.
                ) -> Tuple[List[Any], ...]:
     """
     Applies the function `func` to each set of arguments in `*args`, 
-    possibly using keyword arguments `**kwargs`.
+    possibly using keyword arguments `**kwargs`. 
+    Errors raised by `func` propagate to the caller.
     
     Based on OpenMMLab's implementation in the mmdetection library:
     
     - [OpenMMLab's Implementation](https://github.com/open-mmlab/mmdetection/blob/d64e719172335fa3d7a757a2a3636bd19e9efb62/mmdet/core/utils/misc.py#L11)
 
     """
-    try:
-        pfunc = partial(func, **kwargs) if kwargs else func
-        map_results = map(pfunc, *args)
-        return tuple(map(list, zip(*map_results)))
-    except Exception as e:
-        print(f"Error occurred: {str(e)}")
-        return ()
+    pfunc = partial(func, **kwargs) if kwargs else func
+    map_results = map(pfunc, *args)
+    return tuple(map(list, zip(*map_results)))
 
 # %% ../nbs/01_utils.ipynb 10
 def generate_output_grids(height, width, strides=[8,16,32]):
@@ -72,3 +69,13 @@ def generate_output_grids(height, width, strides=[8,16,32]):
         output_grids = torch.cat(all_coordinates, dim=0)
 
         return output_grids
+
+# %% ../nbs/01_utils.ipynb 12
+def is_channels_last(x:torch.Tensor # The tensor to check.
+                    ) -> bool: # Whether the tensor is a 4D tensor in channels last memory format.
+    """
+    Check whether a 4D tensor uses the channels last memory format, as opposed to being contiguous in the default format.
+    
+    Tensors that are contiguous in both formats (e.g., with a single channel) count as the default format.
+    """
+    return x.dim() == 4 and x.is_contiguous(memory_format=torch.channels_last) and not x.is_contiguous()